@@ -1,5 +1,6 @@
 import os
-from typing import Optional
+import socket
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -11,6 +12,72 @@ class Settings(BaseSettings):
     port_start: int = 9100
     port_end: int = 9120
     
+    # Session mode: "container" gives each session its own Chromium container,
+    # "context" packs sessions into shared containers as isolated browser contexts
+    session_mode: str = "container"
+    contexts_per_container: int = 10
+    
+    # Session expiry in seconds (0 disables); idleness is detected from CDP activity
+    session_idle_timeout: int = 900
+    session_max_lifetime: int = 14400
+    reaper_interval: int = 30
+    
+    # Seconds between checks for session containers that died outside the API (0 disables)
+    session_sync_interval: int = 30
+    
+    # React to browsers dying (Docker events, process exits) as it happens, and
+    # optionally start a new browser under the same session
+    browser_events_enabled: bool = True
+    session_auto_replace: bool = False
+    
+    # Resource profile for sessions that don't name one ("unlimited" keeps Docker's
+    # defaults), and extra or overridden profiles as JSON, e.g.
+    # {"tiny": {"memory": "256m", "cpus": 0.25}}
+    default_profile: str = "unlimited"
+    resource_profiles: Dict[str, dict] = {}
+    
+    # Admission control: requests queue for up to ADMISSION_TIMEOUT seconds when
+    # the API is full or host memory/CPU pressure is above these percentages (0 disables)
+    admission_timeout: float = 30
+    admission_max_queue: int = 100
+    admission_max_memory_percent: float = 90
+    admission_max_cpu_percent: float = 90
+    admission_poll_interval: float = 0.5
+    admission_retry_after: int = 5
+    
+    # Profile templates: prepared user data dirs sessions can start from.
+    # PROFILE_TEMPLATE_HOST_DIR is the same directory as the Docker host sees it,
+    # when the API runs in a container that mounts it somewhere else
+    profile_template_dir: str = "/var/lib/sharkbrowser/templates"
+    profile_template_host_dir: Optional[str] = None
+    
+    # Concurrent launches for POST /v1/sessions/multiple
+    batch_create_concurrency: int = 5
+    
+    # Browsers stopped at once by cleanup, expiry and shutdown, and the seconds
+    # each gets to exit after SIGTERM before it is killed (0 kills immediately)
+    teardown_concurrency: int = 10
+    browser_stop_timeout: int = 5  # dockerd only accepts whole seconds
+    
+    # Live preview at /v1/sessions/{id}/preview, streamed from a CDP screencast.
+    # Quality and frame rate step down from these while a viewer falls behind.
+    preview_enabled: bool = True
+    preview_max_fps: float = 10
+    preview_quality: int = 70
+    preview_max_width: int = 1280
+    preview_max_height: int = 720
+    
+    # Warm pool configuration (set WARM_POOL_MIN_IDLE=0 to disable)
+    warm_pool_min_idle: int = 2
+    warm_pool_max_idle: int = 4
+    # Times a released default-profile browser is reset and handed to the next
+    # session instead of being torn down (0 disables recycling)
+    browser_max_recycles: int = 0
+    
+    # Seconds /ready reuses its last dependency checks, and how long each may take
+    ready_check_interval: float = 10
+    ready_check_timeout: float = 5
+    
     # Server configuration
     host: str = "0.0.0.0"
     port: int = 8000
@@ -20,11 +87,56 @@ class Settings(BaseSettings):
     
     # CDP configuration
     cdp_timeout: int = 30
+    advertised_host: Optional[str] = None  # host put in CDP URLs; auto-detected when unset
+    advertised_host_ttl: int = 3600
+    
+    # Launch backend: "docker" runs each browser in a container, "process" runs
+    # Chromium directly on the host with a user data dir on tmpfs
+    browser_backend: str = "docker"
+    chromium_path: str = "chromium"
+    process_user_data_dir: Optional[str] = None  # defaults to /dev/shm
+    
+    # Docker configuration
+    docker_max_workers: int = 16
+    docker_network: Optional[str] = None  # network shared by the API and browser containers
+    
+    # CDP gateway: serve every browser through /devtools/browser/{session_id} on the API port
+    cdp_gateway_enabled: bool = False
 
+    # Cluster mode: nodes sharing one database register their load in it and
+    # sessions are placed on the least-loaded node
+    cluster_enabled: bool = False
+    node_id: Optional[str] = None  # defaults to hostname:port
+    node_url: Optional[str] = None  # how other nodes reach this API; defaults to http://hostname:port
+    node_heartbeat_interval: int = 5
+    node_ttl: int = 15  # nodes without a heartbeat for this long get no new sessions
+    node_reservation_ttl: int = 120  # unreleased placements are dropped after this long
+    
     # ... existing ...
     database_type: str = "mongodb"  # mongodb | postgresql | sqlite | mysql
     database_url: str = "mongodb://localhost:27017"
     mongodb_db_name: str = "sharkbrowser"
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # seconds to wait for a free pooled connection
+    db_connect_timeout: int = 5
+    
+    @property
+    def gateway_mode(self) -> bool:
+        """Browsers are reached only through the API's CDP gateway.
+        
+        Containers need a shared Docker network for the API to reach them
+        directly; host processes are always reachable.
+        """
+        return self.cdp_gateway_enabled and (bool(self.docker_network) or self.browser_backend == "process")
+    
+    @property
+    def cluster_node_id(self) -> str:
+        return self.node_id or f"{socket.gethostname()}:{self.port}"
+    
+    @property
+    def cluster_node_url(self) -> str:
+        return (self.node_url or f"http://{socket.gethostname()}:{self.port}").rstrip("/")
     
     class Config:
         env_file = ".env"
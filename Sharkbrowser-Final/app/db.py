@@ -1,40 +1,141 @@
 # app/db.py
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
 from app.config import settings
 from app.repositories.session_repo import SessionRepository
 from app.repositories.mongo_repo import MongoSessionRepository
 from app.repositories.sql_repo import SQLSessionRepository
-from motor.motor_asyncio import AsyncIOMotorClient
+from app.repositories.node_repo import NodeRepository
+from app.repositories.mongo_node_repo import MongoNodeRepository
+from app.repositories.sql_node_repo import SQLNodeRepository
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
+SQL_DATABASES = ["postgresql", "sqlite", "mysql"]
+
+# MongoDB
+mongo_client: Optional[AsyncIOMotorClient] = None
+
 # SQLAlchemy
 engine = None
 SessionLocal = None
 
-async def get_repository() -> SessionRepository:
+
+def _collection(name: str) -> AsyncIOMotorCollection:
+    db = mongo_client[settings.mongodb_db_name or "sharkbrowser"]
+    return db[name]
+
+
+def _sessions_collection() -> AsyncIOMotorCollection:
+    return _collection("sessions")
+
+
+def _add_missing_columns(conn):
+    """Add nullable columns introduced since a table was first created.
+    
+    ``create_all`` only creates missing tables, so columns added to an
+    existing model would otherwise break every query against an older
+    database.
+    """
+    from app.models.session_model import Base
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+
+async def init_db():
+    """Create the shared database clients and run schema setup once at startup."""
+    global mongo_client, engine, SessionLocal
+
     if settings.database_type == "mongodb":
-        client = AsyncIOMotorClient(settings.database_url)
-        db = client[settings.mongodb_db_name or "sharkbrowser"]
-        collection = db["sessions"]
+        mongo_client = AsyncIOMotorClient(
+            settings.database_url,
+            maxPoolSize=settings.db_pool_size + settings.db_max_overflow,
+            minPoolSize=min(settings.db_pool_size, 1),
+            waitQueueTimeoutMS=settings.db_pool_timeout * 1000,
+            connectTimeoutMS=settings.db_connect_timeout * 1000,
+            serverSelectionTimeoutMS=settings.db_connect_timeout * 1000
+        )
+        collection = _sessions_collection()
         await collection.create_index("session_id", unique=True)
-        return MongoSessionRepository(collection)
-
-    elif settings.database_type in ["postgresql", "sqlite", "mysql"]:
-        global engine, SessionLocal
-        if engine is None:
-            url = settings.database_url
-            if settings.database_type == "sqlite":
-                url = url.replace("sqlite://", "sqlite+aiosqlite://")
-            elif settings.database_type == "mysql":
+        await collection.create_index([("created_at", 1), ("session_id", 1)])
+        await collection.create_index([("status", 1), ("created_at", 1)])
+        await _collection("nodes").create_index("node_id", unique=True)
+
+    elif settings.database_type in SQL_DATABASES:
+        url = settings.database_url
+        pool_options = {}
+        if settings.database_type == "sqlite":
+            url = url.replace("sqlite://", "sqlite+aiosqlite://")
+        else:
+            if settings.database_type == "mysql":
                 url = url.replace("mysql://", "mysql+aiomysql://")
-            engine = create_async_engine(url, echo=False)
-            SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            pool_options = {
+                "pool_size": settings.db_pool_size,
+                "max_overflow": settings.db_max_overflow,
+                "pool_timeout": settings.db_pool_timeout,
+                "pool_pre_ping": True
+            }
+        engine = create_async_engine(url, echo=False, **pool_options)
+        SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        from app.models.session_model import Base
+        from app.models import node_model  # registers the nodes table
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_add_missing_columns)
 
+    else:
+        raise ValueError(f"Unsupported DATABASE_TYPE: {settings.database_type}")
+
+
+async def close_db():
+    global mongo_client, engine, SessionLocal
+    if mongo_client is not None:
+        mongo_client.close()
+        mongo_client = None
+    if engine is not None:
+        await engine.dispose()
+        engine = None
+        SessionLocal = None
+
+
+@asynccontextmanager
+async def repository_scope() -> AsyncIterator[SessionRepository]:
+    """Hand out a repository backed by the shared clients.
+
+    Use this for work outside a request, such as background tasks or
+    streaming responses; routes use ``get_repository``.
+    """
+    if settings.database_type == "mongodb":
+        yield MongoSessionRepository(_sessions_collection())
+    elif settings.database_type in SQL_DATABASES:
         async with SessionLocal() as session:
-            from app.models.session_model import Base
-            async with engine.begin() as conn:
-                await conn.run_sync(Base.metadata.create_all)
-            return SQLSessionRepository(session)
+            yield SQLSessionRepository(session)
+    else:
+        raise ValueError(f"Unsupported DATABASE_TYPE: {settings.database_type}")
+
+
+async def get_repository() -> AsyncIterator[SessionRepository]:
+    async with repository_scope() as repo:
+        yield repo
 
+
+@asynccontextmanager
+async def node_repository_scope() -> AsyncIterator[NodeRepository]:
+    """Hand out the node registry backed by the shared clients."""
+    if settings.database_type == "mongodb":
+        yield MongoNodeRepository(_collection("nodes"))
+    elif settings.database_type in SQL_DATABASES:
+        async with SessionLocal() as session:
+            yield SQLNodeRepository(session)
     else:
-        raise ValueError(f"Unsupported DATABASE_TYPE: {settings.database_type}")
\ No newline at end of file
+        raise ValueError(f"Unsupported DATABASE_TYPE: {settings.database_type}")
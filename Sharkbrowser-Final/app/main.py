@@ -1,8 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.routes import sessions, health
+from app.routes import sessions, templates, preview, health, gateway, metrics
 from app.services.browser_manager import browser_manager
+from app.services.docker_client import docker_client
+from app.services.jobs import jobs
+from app.db import init_db, close_db, repository_scope
+from app.utils.host_resolver import host_resolver
 from app.config import settings
 
 
@@ -11,14 +15,44 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown."""
     # Startup
     print("🦈 Starting SharkBrowser API...")
+    if settings.browser_max_recycles > 0 and not settings.gateway_mode:
+        # A recycled browser keeps its port, which the previous client can still reach
+        raise RuntimeError("BROWSER_MAX_RECYCLES requires the CDP gateway (CDP_GATEWAY_ENABLED with DOCKER_NETWORK)")
+    if settings.session_mode == "context" and not settings.gateway_mode:
+        # Contexts in a shared container all sit behind the same debugging port
+        raise RuntimeError("SESSION_MODE=context requires the CDP gateway (CDP_GATEWAY_ENABLED with DOCKER_NETWORK)")
     print(f"📊 Max browsers: {settings.max_browsers}")
-    print(f"🔌 Port range: {settings.port_start}-{settings.port_end}")
+    print(f"🚀 Browser backend: {settings.browser_backend}")
+    if settings.gateway_mode:
+        via = f" via network {settings.docker_network}" if settings.docker_network else ""
+        print(f"🔀 CDP gateway: sessions served on port {settings.port}{via}")
+    else:
+        print(f"🔌 Port range: {settings.port_start}-{settings.port_end}")
+        if settings.cdp_gateway_enabled:
+            print("⚠️ CDP_GATEWAY_ENABLED requires DOCKER_NETWORK; publishing browser ports instead")
+    print(f"🔥 Warm pool: {settings.warm_pool_min_idle}-{settings.warm_pool_max_idle} idle browsers")
+    await init_db()
+    print(f"🗄️ Database: {settings.database_type}")
+    print(f"🌐 Advertised host: {await host_resolver.get()}")
+    try:
+        async with repository_scope() as repo:
+            adopted, removed, stale = await browser_manager.reconcile(repo)
+        print(f"♻️ Reconciled: {adopted} sessions re-adopted, {removed} orphaned browsers removed, "
+              f"{stale} stale sessions deleted")
+    except Exception as e:
+        print(f"⚠️ Startup reconciliation failed: {e}")
+    browser_manager.start()
     
     yield
     
     # Shutdown
     print("🛑 Shutting down SharkBrowser API...")
-    await browser_manager.cleanup_all()
+    await browser_manager.stop()
+    await jobs.wait()
+    async with repository_scope() as repo:
+        await browser_manager.cleanup_all(repo)
+    docker_client.close()
+    await close_db()
 
 
 # Create FastAPI application
@@ -40,7 +74,11 @@ app.add_middleware(
 
 # Include routers
 app.include_router(sessions.router)
+app.include_router(templates.router)
+app.include_router(preview.router)
 app.include_router(health.router)
+app.include_router(gateway.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -51,7 +89,10 @@ async def root():
         "version": "1.0.0",
         "docs": "/docs",
         "health": "/health",
+        "ready": "/ready",
+        "metrics": "/metrics",
         "sessions": "/v1/sessions",
+        "templates": "/v1/templates",
         "example": "POST /v1/sessions to create a browser and get WebSocket URL"
     }
 
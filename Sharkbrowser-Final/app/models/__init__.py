@@ -4,6 +4,6 @@ Data Models Package
 This package contains Pydantic models for request/response validation.
 """
 
-from . import session_model
+from . import session_model, node_model, template_model, job_model
 
-__all__ = ["session_model"]
+__all__ = ["session_model", "node_model", "template_model", "job_model"]
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Dict, Optional
+from pydantic import BaseModel
+
+
+class JobInfo(BaseModel):
+    """Progress of a background job such as a bulk cleanup."""
+    job_id: str
+    kind: str
+    status: str  # "running", "completed" or "failed"
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class CleanupJobResponse(BaseModel):
+    """Response model for starting a cleanup."""
+    job_id: str
+    message: str
+    status_url: str
+    nodes: Dict[str, Optional[str]] = {}  # other nodes' cleanup job IDs in cluster mode
@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from sqlalchemy import Column, String, Integer, DateTime
+from app.models.session_model import Base
+
+
+class NodeInfo(BaseModel):
+    """A SharkBrowser API node registered in the shared repository."""
+    node_id: str
+    url: str  # base URL other nodes use to reach this one
+    capacity: int  # sessions this node can hold
+    active: int = 0
+    reserved: int = 0  # placements promised to this node but not yet created
+    heartbeat_at: datetime
+    reserved_at: Optional[datetime] = None
+    
+    @property
+    def load(self) -> float:
+        return (self.active + self.reserved) / max(self.capacity, 1)
+
+
+class DBNode(Base):
+    __tablename__ = "nodes"
+    node_id = Column(String, primary_key=True)
+    url = Column(String)
+    capacity = Column(Integer, default=0)
+    active = Column(Integer, default=0)
+    reserved = Column(Integer, default=0)
+    heartbeat_at = Column(DateTime, index=True)
+    reserved_at = Column(DateTime, nullable=True)
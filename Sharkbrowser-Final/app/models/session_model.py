@@ -1,12 +1,26 @@
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel
-from sqlalchemy import Column, String, Integer, DateTime, func
-from app.db import Base  # ← will create later
+from typing import Dict, Optional, List, Literal
+from pydantic import BaseModel, Field
+from sqlalchemy import Column, String, Integer, DateTime, Index, func
+from sqlalchemy.orm import declarative_base
+from app.config import settings
+
+Base = declarative_base()
 
 class SessionCreateRequest(BaseModel):
     """Request model for creating a new browser session."""
     session_id: Optional[str] = None
+    mode: Optional[Literal["container", "context"]] = None  # defaults to SESSION_MODE
+    profile: Optional[str] = None  # resource profile, defaults to DEFAULT_PROFILE
+    template: Optional[str] = None  # profile template to start from; container mode only
+    priority: int = 0  # higher is admitted first when queueing for capacity
+    wait_timeout: Optional[float] = Field(default=None, ge=0, le=300)  # defaults to ADMISSION_TIMEOUT
+
+
+class SessionBatchCreateRequest(BaseModel):
+    """Request model for creating several browser sessions at once."""
+    count: int = Field(default=5, ge=1, le=settings.max_browsers)
+    profile: Optional[str] = None
 
 
 class SessionInfo(BaseModel):
@@ -20,12 +34,32 @@ class SessionInfo(BaseModel):
     uptime_seconds: int
     status: str = "active"
     video_preview_link: Optional[str] = None
+    node_id: Optional[str] = None  # API node that owns the browser
+
+
+class SessionQuery(BaseModel):
+    """Filters and keyset cursor for listing sessions, oldest first."""
+    status: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    cursor: Optional[str] = None
+    limit: int = Field(default=100, ge=1, le=1000)
+    
+    def matches(self, session: SessionInfo) -> bool:
+        if self.status and session.status != self.status:
+            return False
+        if self.created_after and session.created_at <= self.created_after:
+            return False
+        if self.created_before and session.created_at >= self.created_before:
+            return False
+        return True
 
 
 class SessionListResponse(BaseModel):
     """Response model for listing sessions."""
     sessions: List[SessionInfo]
     total_count: int
+    next_cursor: Optional[str] = None
 
 
 class SessionCreateResponse(BaseModel):
@@ -35,6 +69,7 @@ class SessionCreateResponse(BaseModel):
     cdp_endpoint: str
     cdp_websocket_url: Optional[str] = None
     cdp_discovery_url: Optional[str] = None
+    video_preview_link: Optional[str] = None
     message: str
 
 
@@ -50,7 +85,7 @@ class SessionReleaseResponse(BaseModel):
 
 
 class HealthResponse(BaseModel):
-    """Response model for health check."""
+    """Response model for the liveness check."""
     status: str
     timestamp: datetime
     uptime_seconds: int
@@ -59,6 +94,20 @@ class HealthResponse(BaseModel):
     available_ports: int
 
 
+class ReadinessCheck(BaseModel):
+    """Outcome of one dependency check behind /ready."""
+    ok: bool
+    latency_ms: float
+    error: Optional[str] = None
+
+
+class ReadinessResponse(BaseModel):
+    """Response model for the readiness check, as of ``checked_at``."""
+    status: str  # "ready" or "not_ready"
+    checked_at: datetime
+    checks: Dict[str, ReadinessCheck]
+
+
 class ErrorResponse(BaseModel):
     """Error response model."""
     error: str
@@ -67,6 +116,10 @@ class ErrorResponse(BaseModel):
 
 class DBSession(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_created_at_session_id", "created_at", "session_id"),
+        Index("ix_sessions_status_created_at", "status", "created_at"),
+    )
     session_id = Column(String, primary_key=True)
     port = Column(Integer)
     cdp_endpoint = Column(String)
@@ -75,4 +128,5 @@ class DBSession(Base):
     created_at = Column(DateTime, default=func.now())
     status = Column(String, default="active")
     video_preview_link = Column(String, nullable=True)
+    node_id = Column(String, nullable=True)
 
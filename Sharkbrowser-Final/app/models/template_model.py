@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+# Template names double as directory names
+TEMPLATE_NAME_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$"
+
+
+class TemplateInfo(BaseModel):
+    """A prepared Chromium user data dir sessions can start from."""
+    name: str
+    size_bytes: int
+    created_at: datetime
+    source_session_id: Optional[str] = None
+    include_cookies: bool = False
+
+
+class TemplateCaptureRequest(BaseModel):
+    """Request model for capturing a running session's profile as a template."""
+    session_id: str
+    name: str = Field(pattern=TEMPLATE_NAME_PATTERN)
+    include_cookies: bool = False  # also keep cookies, i.e. logged-in state
+    overwrite: bool = False
@@ -0,0 +1,53 @@
+# app/repositories/mongo_node_repo.py
+from .node_repo import NodeRepository
+from motor.motor_asyncio import AsyncIOMotorCollection
+from app.models.node_model import NodeInfo
+from typing import List, Optional
+from datetime import datetime
+
+class MongoNodeRepository(NodeRepository):
+    def __init__(self, collection: AsyncIOMotorCollection):
+        self.collection = collection
+
+    async def heartbeat(self, node: NodeInfo):
+        await self.collection.update_one(
+            {"node_id": node.node_id},
+            {
+                "$set": node.dict(include={"url", "capacity", "active", "heartbeat_at"}),
+                "$setOnInsert": {"reserved": 0, "reserved_at": None}
+            },
+            upsert=True
+        )
+
+    async def get(self, node_id: str) -> Optional[NodeInfo]:
+        doc = await self.collection.find_one({"node_id": node_id}, {"_id": 0})
+        return NodeInfo(**doc) if doc else None
+
+    async def list_live(self, since: datetime) -> List[NodeInfo]:
+        cursor = self.collection.find({"heartbeat_at": {"$gte": since}}, {"_id": 0})
+        return [NodeInfo(**doc) async for doc in cursor]
+
+    async def try_reserve(self, node_id: str) -> bool:
+        result = await self.collection.update_one(
+            {
+                "node_id": node_id,
+                "$expr": {"$lt": [{"$add": ["$active", "$reserved"]}, "$capacity"]}
+            },
+            {"$inc": {"reserved": 1}, "$set": {"reserved_at": datetime.now()}}
+        )
+        return result.modified_count == 1
+
+    async def release_reservation(self, node_id: str):
+        await self.collection.update_one(
+            {"node_id": node_id, "reserved": {"$gt": 0}},
+            {"$inc": {"reserved": -1}}
+        )
+
+    async def expire_reservations(self, node_id: str, before: datetime):
+        await self.collection.update_one(
+            {"node_id": node_id, "reserved": {"$gt": 0}, "reserved_at": {"$lt": before}},
+            {"$set": {"reserved": 0}}
+        )
+
+    async def delete(self, node_id: str):
+        await self.collection.delete_one({"node_id": node_id})
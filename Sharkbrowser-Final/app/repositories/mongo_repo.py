@@ -1,8 +1,8 @@
 # app/repositories/mongo_repo.py
-from .session_repo import SessionRepository
+from .session_repo import SessionRepository, LIST_FIELDS, decode_cursor, encode_cursor, with_uptime
 from motor.motor_asyncio import AsyncIOMotorCollection
-from app.models.session_model import SessionInfo
-from typing import List, Optional
+from app.models.session_model import SessionInfo, SessionQuery
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 class MongoSessionRepository(SessionRepository):
@@ -10,7 +10,10 @@ class MongoSessionRepository(SessionRepository):
         self.collection = collection
 
     async def create(self, session: SessionInfo):
-        await self.collection.insert_one(session.dict())
+        await self.collection.insert_one(session.dict(exclude={"uptime_seconds"}))
+
+    async def create_many(self, sessions: List[SessionInfo]):
+        await self.collection.insert_many([session.dict(exclude={"uptime_seconds"}) for session in sessions])
 
     async def get(self, session_id: str) -> Optional[SessionInfo]:
         doc = await self.collection.find_one({"session_id": session_id})
@@ -19,6 +22,11 @@ class MongoSessionRepository(SessionRepository):
             return SessionInfo(**doc)
         return None
 
+    async def get_many(self, session_ids: List[str]) -> List[SessionInfo]:
+        if not session_ids:
+            return []
+        return [with_uptime(doc) async for doc in self.collection.find({"session_id": {"$in": session_ids}})]
+
     async def list_all(self) -> List[SessionInfo]:
         cursor = self.collection.find({})
         sessions = []
@@ -27,12 +35,68 @@ class MongoSessionRepository(SessionRepository):
             sessions.append(SessionInfo(**doc))
         return sessions
 
+    @staticmethod
+    def _conditions(query: SessionQuery) -> List[dict]:
+        conditions = []
+        if query.status:
+            conditions.append({"status": query.status})
+        created = {}
+        if query.created_after:
+            created["$gt"] = query.created_after
+        if query.created_before:
+            created["$lt"] = query.created_before
+        if created:
+            conditions.append({"created_at": created})
+        return conditions
+
+    async def list_page(self, query: SessionQuery) -> Tuple[List[SessionInfo], Optional[str]]:
+        conditions = self._conditions(query)
+        if query.cursor:
+            created_at, session_id = decode_cursor(query.cursor)
+            conditions.append({"$or": [
+                {"created_at": {"$gt": created_at}},
+                {"created_at": created_at, "session_id": {"$gt": session_id}}
+            ]})
+
+        projection = {"_id": 0, **{field: 1 for field in LIST_FIELDS}}
+        cursor = (
+            self.collection.find({"$and": conditions} if conditions else {}, projection)
+            .sort([("created_at", 1), ("session_id", 1)])
+            .limit(query.limit)
+        )
+        sessions = [with_uptime(doc) async for doc in cursor]
+        next_cursor = encode_cursor(sessions[-1]) if len(sessions) == query.limit else None
+        return sessions, next_cursor
+
+    async def count(self, query: SessionQuery) -> int:
+        conditions = self._conditions(query)
+        return await self.collection.count_documents({"$and": conditions} if conditions else {})
+
     async def delete(self, session_id: str) -> bool:
         result = await self.collection.delete_one({"session_id": session_id})
         return result.deleted_count > 0
 
+    async def delete_many(self, session_ids: List[str]) -> int:
+        if not session_ids:
+            return 0
+        result = await self.collection.delete_many({"session_id": {"$in": session_ids}})
+        return result.deleted_count
+
+    async def delete_except(self, session_ids: List[str], node_id: Optional[str] = None) -> int:
+        conditions = {"session_id": {"$nin": session_ids}}
+        if node_id:
+            conditions["node_id"] = node_id
+        result = await self.collection.delete_many(conditions)
+        return result.deleted_count
+
+    async def update_fields(self, session_id: str, fields: Dict[str, Any]):
+        await self.collection.update_one({"session_id": session_id}, {"$set": fields})
+
     async def update_video_preview(self, session_id: str, url: str):
         await self.collection.update_one(
             {"session_id": session_id},
             {"$set": {"video_preview_link": url}}
-        )
\ No newline at end of file
+        )
+
+    async def ping(self):
+        await self.collection.database.command("ping")
\ No newline at end of file
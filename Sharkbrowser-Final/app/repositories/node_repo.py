@@ -0,0 +1,37 @@
+# app/repositories/node_repo.py
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+from app.models.node_model import NodeInfo
+
+
+class NodeRepository(ABC):
+    """Registry of API nodes and their load, shared by every node."""
+
+    @abstractmethod
+    async def heartbeat(self, node: NodeInfo) -> None:
+        """Register ``node`` or refresh its URL, capacity, load and heartbeat.
+
+        Never touches ``reserved``, which other nodes update concurrently.
+        """
+
+    @abstractmethod
+    async def get(self, node_id: str) -> Optional[NodeInfo]: ...
+
+    @abstractmethod
+    async def list_live(self, since: datetime) -> List[NodeInfo]:
+        """Nodes that sent a heartbeat at or after ``since``."""
+
+    @abstractmethod
+    async def try_reserve(self, node_id: str) -> bool:
+        """Atomically claim one session slot if the node still has room."""
+
+    @abstractmethod
+    async def release_reservation(self, node_id: str) -> None: ...
+
+    @abstractmethod
+    async def expire_reservations(self, node_id: str, before: datetime) -> None:
+        """Drop reservations left behind by nodes that died mid-placement."""
+
+    @abstractmethod
+    async def delete(self, node_id: str) -> None: ...
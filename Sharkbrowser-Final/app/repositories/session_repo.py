@@ -1,20 +1,88 @@
 # app/repositories/session_repo.py
+import base64
+import json
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from app.models.session_model import SessionInfo
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.models.session_model import SessionInfo, SessionQuery
+
+# Columns read when listing; uptime is derived from created_at
+LIST_FIELDS = [name for name in SessionInfo.model_fields if name != "uptime_seconds"]
+
+
+def encode_cursor(session: SessionInfo) -> str:
+    """Opaque keyset cursor pointing just after ``session``."""
+    key = [session.created_at.isoformat(), session.session_id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor from ``encode_cursor``; raises ValueError if malformed."""
+    try:
+        created_at, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), session_id
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def with_uptime(data: dict) -> SessionInfo:
+    data["uptime_seconds"] = int((datetime.now() - data["created_at"]).total_seconds())
+    return SessionInfo(**data)
+
 
 class SessionRepository(ABC):
     @abstractmethod
     async def create(self, session: SessionInfo) -> None: ...
 
+    @abstractmethod
+    async def create_many(self, sessions: List[SessionInfo]) -> None: ...
+
     @abstractmethod
     async def get(self, session_id: str) -> Optional[SessionInfo]: ...
 
+    @abstractmethod
+    async def get_many(self, session_ids: List[str]) -> List[SessionInfo]:
+        """Fetch the sessions among ``session_ids`` that exist, in one query."""
+
     @abstractmethod
     async def list_all(self) -> List[SessionInfo]: ...
 
+    @abstractmethod
+    async def list_page(self, query: SessionQuery) -> Tuple[List[SessionInfo], Optional[str]]:
+        """Return one page of matching sessions and the cursor for the next page."""
+
+    @abstractmethod
+    async def count(self, query: SessionQuery) -> int:
+        """Count sessions matching the query's filters, ignoring its cursor."""
+
+    async def iter_sessions(self, query: SessionQuery) -> AsyncIterator[SessionInfo]:
+        """Stream every matching session, fetching one page at a time."""
+        while True:
+            page, next_cursor = await self.list_page(query)
+            for session in page:
+                yield session
+            if not next_cursor:
+                return
+            query = query.model_copy(update={"cursor": next_cursor})
+
     @abstractmethod
     async def delete(self, session_id: str) -> bool: ...
 
     @abstractmethod
-    async def update_video_preview(self, session_id: str, url: str) -> None: ...
\ No newline at end of file
+    async def delete_many(self, session_ids: List[str]) -> int:
+        """Delete the given sessions in one query; returns how many existed."""
+
+    @abstractmethod
+    async def delete_except(self, session_ids: List[str], node_id: Optional[str] = None) -> int:
+        """Delete every session not in ``session_ids``, only ``node_id``'s when given."""
+
+    @abstractmethod
+    async def update_fields(self, session_id: str, fields: Dict[str, Any]) -> None:
+        """Overwrite some of a stored session's fields."""
+
+    @abstractmethod
+    async def update_video_preview(self, session_id: str, url: str) -> None: ...
+
+    @abstractmethod
+    async def ping(self) -> None:
+        """Round-trip to the database; raises if it is unreachable."""
\ No newline at end of file
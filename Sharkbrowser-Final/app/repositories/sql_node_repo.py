@@ -0,0 +1,66 @@
+# app/repositories/sql_node_repo.py
+from .node_repo import NodeRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update
+from app.models.node_model import DBNode, NodeInfo
+from typing import List, Optional
+from datetime import datetime
+
+NODE_FIELDS = list(NodeInfo.model_fields)
+
+class SQLNodeRepository(NodeRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def heartbeat(self, node: NodeInfo):
+        values = node.dict(include={"url", "capacity", "active", "heartbeat_at"})
+        result = await self.db.execute(
+            update(DBNode).where(DBNode.node_id == node.node_id).values(**values)
+        )
+        if result.rowcount == 0:
+            self.db.add(DBNode(node_id=node.node_id, reserved=0, **values))
+        await self.db.commit()
+
+    async def get(self, node_id: str) -> Optional[NodeInfo]:
+        result = await self.db.execute(
+            select(*[getattr(DBNode, field) for field in NODE_FIELDS]).where(DBNode.node_id == node_id)
+        )
+        row = result.first()
+        return NodeInfo(**row._mapping) if row else None
+
+    async def list_live(self, since: datetime) -> List[NodeInfo]:
+        result = await self.db.execute(
+            select(*[getattr(DBNode, field) for field in NODE_FIELDS]).where(DBNode.heartbeat_at >= since)
+        )
+        return [NodeInfo(**row._mapping) for row in result]
+
+    async def try_reserve(self, node_id: str) -> bool:
+        # A conditional UPDATE is atomic on every backend, so two nodes can't
+        # both take the last slot
+        result = await self.db.execute(
+            update(DBNode)
+            .where(DBNode.node_id == node_id, DBNode.active + DBNode.reserved < DBNode.capacity)
+            .values(reserved=DBNode.reserved + 1, reserved_at=datetime.now())
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def release_reservation(self, node_id: str):
+        await self.db.execute(
+            update(DBNode)
+            .where(DBNode.node_id == node_id, DBNode.reserved > 0)
+            .values(reserved=DBNode.reserved - 1)
+        )
+        await self.db.commit()
+
+    async def expire_reservations(self, node_id: str, before: datetime):
+        await self.db.execute(
+            update(DBNode)
+            .where(DBNode.node_id == node_id, DBNode.reserved > 0, DBNode.reserved_at < before)
+            .values(reserved=0)
+        )
+        await self.db.commit()
+
+    async def delete(self, node_id: str):
+        await self.db.execute(delete(DBNode).where(DBNode.node_id == node_id))
+        await self.db.commit()
@@ -1,9 +1,9 @@
 # app/repositories/sql_repo.py
-from .session_repo import SessionRepository
+from .session_repo import SessionRepository, LIST_FIELDS, decode_cursor, encode_cursor, with_uptime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
-from app.models.session_model import DBSession, SessionInfo
-from typing import List, Optional
+from sqlalchemy import select, delete, update, and_, or_, func
+from app.models.session_model import DBSession, SessionInfo, SessionQuery
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 class SQLSessionRepository(SessionRepository):
@@ -11,10 +11,14 @@ class SQLSessionRepository(SessionRepository):
         self.db = db
 
     async def create(self, session: SessionInfo):
-        db_session = DBSession(**session.dict())
+        db_session = DBSession(**session.dict(exclude={"uptime_seconds"}))
         self.db.add(db_session)
         await self.db.commit()
 
+    async def create_many(self, sessions: List[SessionInfo]):
+        self.db.add_all([DBSession(**session.dict(exclude={"uptime_seconds"})) for session in sessions])
+        await self.db.commit()
+
     async def get(self, session_id: str) -> Optional[SessionInfo]:
         result = await self.db.execute(select(DBSession).where(DBSession.session_id == session_id))
         row = result.scalar_one_or_none()
@@ -24,6 +28,12 @@ class SQLSessionRepository(SessionRepository):
             return SessionInfo(**data)
         return None
 
+    async def get_many(self, session_ids: List[str]) -> List[SessionInfo]:
+        if not session_ids:
+            return []
+        result = await self.db.execute(select(DBSession).where(DBSession.session_id.in_(session_ids)))
+        return [with_uptime({**row.__dict__}) for row in result.scalars()]
+
     async def list_all(self) -> List[SessionInfo]:
         result = await self.db.execute(select(DBSession))
         sessions = []
@@ -33,15 +43,66 @@ class SQLSessionRepository(SessionRepository):
             sessions.append(SessionInfo(**data))
         return sessions
 
+    @staticmethod
+    def _filter(statement, query: SessionQuery):
+        if query.status:
+            statement = statement.where(DBSession.status == query.status)
+        if query.created_after:
+            statement = statement.where(DBSession.created_at > query.created_after)
+        if query.created_before:
+            statement = statement.where(DBSession.created_at < query.created_before)
+        return statement
+
+    async def list_page(self, query: SessionQuery) -> Tuple[List[SessionInfo], Optional[str]]:
+        statement = self._filter(select(*[getattr(DBSession, field) for field in LIST_FIELDS]), query)
+        if query.cursor:
+            created_at, session_id = decode_cursor(query.cursor)
+            statement = statement.where(or_(
+                DBSession.created_at > created_at,
+                and_(DBSession.created_at == created_at, DBSession.session_id > session_id)
+            ))
+        statement = statement.order_by(DBSession.created_at, DBSession.session_id).limit(query.limit)
+
+        result = await self.db.execute(statement)
+        sessions = [with_uptime(dict(row._mapping)) for row in result]
+        next_cursor = encode_cursor(sessions[-1]) if len(sessions) == query.limit else None
+        return sessions, next_cursor
+
+    async def count(self, query: SessionQuery) -> int:
+        result = await self.db.execute(self._filter(select(func.count()).select_from(DBSession), query))
+        return result.scalar_one()
+
     async def delete(self, session_id: str) -> bool:
         result = await self.db.execute(delete(DBSession).where(DBSession.session_id == session_id))
         await self.db.commit()
         return result.rowcount > 0
 
+    async def delete_many(self, session_ids: List[str]) -> int:
+        if not session_ids:
+            return 0
+        result = await self.db.execute(delete(DBSession).where(DBSession.session_id.in_(session_ids)))
+        await self.db.commit()
+        return result.rowcount
+
+    async def delete_except(self, session_ids: List[str], node_id: Optional[str] = None) -> int:
+        statement = delete(DBSession).where(DBSession.session_id.not_in(session_ids))
+        if node_id:
+            statement = statement.where(DBSession.node_id == node_id)
+        result = await self.db.execute(statement)
+        await self.db.commit()
+        return result.rowcount
+
+    async def update_fields(self, session_id: str, fields: Dict[str, Any]):
+        await self.db.execute(update(DBSession).where(DBSession.session_id == session_id).values(**fields))
+        await self.db.commit()
+
     async def update_video_preview(self, session_id: str, url: str):
         await self.db.execute(
             update(DBSession)
             .where(DBSession.session_id == session_id)
             .values(video_preview_link=url)
         )
-        await self.db.commit()
\ No newline at end of file
+        await self.db.commit()
+
+    async def ping(self):
+        await self.db.execute(select(1))
\ No newline at end of file
@@ -4,6 +4,6 @@ API Routes Package
 This package contains all the API route modules for the SharkBrowser API.
 """
 
-from . import sessions, health
+from . import sessions, templates, preview, health, gateway, metrics
 
-__all__ = ["sessions", "health"]
+__all__ = ["sessions", "templates", "preview", "health", "gateway", "metrics"]
@@ -0,0 +1,83 @@
+# app/routes/gateway.py
+import asyncio
+import aiohttp
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from app.services.browser_manager import browser_manager
+
+router = APIRouter(tags=["gateway"])
+
+
+async def _client_to_browser(websocket: WebSocket, upstream: aiohttp.ClientWebSocketResponse, session):
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        session.touch()
+        # Each frame is awaited before the next is read, so a slow browser
+        # pushes back on the client instead of buffering in the API.
+        if message.get("text") is not None:
+            await upstream.send_str(message["text"])
+        elif message.get("bytes") is not None:
+            await upstream.send_bytes(message["bytes"])
+
+
+async def _browser_to_client(websocket: WebSocket, upstream: aiohttp.ClientWebSocketResponse):
+    async for message in upstream:
+        if message.type == aiohttp.WSMsgType.TEXT:
+            await websocket.send_text(message.data)
+        elif message.type == aiohttp.WSMsgType.BINARY:
+            await websocket.send_bytes(message.data)
+        else:
+            return
+
+
+@router.websocket("/devtools/browser/{session_id}")
+async def cdp_browser_gateway(websocket: WebSocket, session_id: str):
+    """Proxy a browser-level CDP WebSocket to a container session."""
+    await _proxy_session(websocket, session_id, "browser")
+
+
+@router.websocket("/devtools/page/{session_id}")
+async def cdp_page_gateway(websocket: WebSocket, session_id: str):
+    """Proxy a page-level CDP WebSocket to a context session."""
+    await _proxy_session(websocket, session_id, "page")
+
+
+async def _proxy_session(websocket: WebSocket, session_id: str, kind: str):
+    session = browser_manager.sessions.get(session_id)
+    # Context sessions only expose their own page, never the shared browser
+    if not session or not session.browser_id or session.websocket_kind != kind:
+        await websocket.close(code=4404, reason=f"Session '{session_id}' not found")
+        return
+
+    async with aiohttp.ClientSession() as http:
+        try:
+            upstream = await http.ws_connect(
+                session.upstream_websocket_url,
+                max_msg_size=0,
+                autoping=True
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"CDP gateway failed to reach session {session_id}: {e}")
+            await websocket.close(code=1011, reason="Browser unavailable")
+            return
+
+        await websocket.accept()
+        session.gateway_clients += 1
+        pumps = [
+            asyncio.create_task(_client_to_browser(websocket, upstream, session)),
+            asyncio.create_task(_browser_to_client(websocket, upstream))
+        ]
+        try:
+            await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            session.gateway_clients -= 1
+            session.touch()
+            for pump in pumps:
+                pump.cancel()
+            await asyncio.gather(*pumps, return_exceptions=True)
+            await upstream.close()
+            try:
+                await websocket.close()
+            except (RuntimeError, WebSocketDisconnect):
+                pass
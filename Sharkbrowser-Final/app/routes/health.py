@@ -1,25 +1,35 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
 from datetime import datetime
 from app.services.browser_manager import browser_manager
+from app.services.readiness import readiness
 from app.config import settings
 from app.utils.port_helper import port_allocator
-from app.models.session_model import HealthResponse
+from app.models.session_model import HealthResponse, ReadinessResponse
 
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint for monitoring API and Playwright readiness."""
-    active_sessions = len(browser_manager.list_sessions())
-    available_ports = port_allocator.get_available_count()
-    
+    """Liveness check, answered from in-memory counters without touching any dependency."""
     return HealthResponse(
         status="healthy",
         timestamp=datetime.now(),
         uptime_seconds=browser_manager.get_uptime_seconds(),
-        active_sessions=active_sessions,
+        active_sessions=len(browser_manager.sessions),
         max_sessions=settings.max_browsers,
-        available_ports=available_ports
+        available_ports=port_allocator.get_available_count()
     )
 
+
+@router.get("/ready", response_model=ReadinessResponse, responses={503: {"model": ReadinessResponse}})
+async def readiness_check():
+    """Readiness check of the database, Docker daemon and browser image; 503 when any fails.
+    
+    Results are cached for READY_CHECK_INTERVAL seconds.
+    """
+    result = await readiness.get()
+    if result.status != "ready":
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=result.model_dump(mode="json"))
+    return result
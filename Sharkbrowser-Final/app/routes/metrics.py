@@ -0,0 +1,39 @@
+# app/routes/metrics.py
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from app.services.browser_manager import browser_manager
+from app.services.shared_browser import ContextSession
+from app.utils.host_pressure import host_pressure
+from app.utils.metrics import ADMISSION_QUEUE_LENGTH, BROWSERS, HOST_PRESSURE, PORTS, SESSIONS_ACTIVE
+from app.utils.port_helper import port_allocator
+
+router = APIRouter(tags=["metrics"])
+
+
+def _record_state():
+    """Refresh gauges that mirror in-memory state right before a scrape."""
+    contexts = sum(1 for session in browser_manager.sessions.values() if isinstance(session, ContextSession))
+    SESSIONS_ACTIVE.labels("context").set(contexts)
+    SESSIONS_ACTIVE.labels("container").set(len(browser_manager.sessions) - contexts)
+    
+    BROWSERS.labels("dedicated").set(len(browser_manager.sessions) - contexts)
+    BROWSERS.labels("shared").set(len(browser_manager.shared_browsers))
+    BROWSERS.labels("pool_idle").set(len(browser_manager.warm_pool.idle))
+    BROWSERS.labels("starting").set(browser_manager.launching + browser_manager.warm_pool.starting)
+    
+    ADMISSION_QUEUE_LENGTH.set(browser_manager.admission.queued)
+    memory, cpu = host_pressure.sample()
+    HOST_PRESSURE.labels("memory").set(memory)
+    HOST_PRESSURE.labels("cpu").set(cpu)
+    
+    PORTS.labels("total").set(len(port_allocator.port_range))
+    PORTS.labels("leased").set(len(port_allocator.leases))
+    PORTS.labels("free").set(port_allocator.get_available_count())
+    PORTS.labels("blocked").set(len(port_allocator.blocked))
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for session lifecycle, Docker calls and capacity."""
+    _record_state()
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,79 @@
+# app/routes/preview.py
+import asyncio
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.services.browser_manager import browser_manager
+from app.services.screencast import screencasts
+
+router = APIRouter(prefix="/v1/sessions", tags=["preview"])
+
+MJPEG_BOUNDARY = "frame"
+
+
+def _preview_session(session_id: str):
+    """The session to preview, or None if it is not running on this node."""
+    session = browser_manager.sessions.get(session_id)
+    if not settings.preview_enabled or not session or not session.browser_id:
+        return None
+    return session
+
+
+@router.get("/{session_id}/preview")
+async def preview_mjpeg(session_id: str):
+    """Watch a session's page live as an MJPEG stream, e.g. in an ``<img>`` tag."""
+    session = _preview_session(session_id)
+    if not session:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Session '{session_id}' not found")
+    
+    async def stream_frames():
+        async with screencasts.watch(session) as viewer:
+            while True:
+                frame = await viewer.next_frame()
+                if frame is None:
+                    return
+                yield (
+                    f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(frame)}\r\n\r\n".encode()
+                    + frame + b"\r\n"
+                )
+    
+    return StreamingResponse(
+        stream_frames(),
+        media_type=f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}",
+        headers={"Cache-Control": "no-store"}
+    )
+
+
+@router.websocket("/{session_id}/preview/ws")
+async def preview_websocket(websocket: WebSocket, session_id: str):
+    """Watch a session's page live, one binary JPEG message per frame."""
+    session = _preview_session(session_id)
+    if not session:
+        await websocket.close(code=4404, reason=f"Session '{session_id}' not found")
+        return
+    
+    await websocket.accept()
+    
+    async def send_frames(viewer):
+        while True:
+            frame = await viewer.next_frame()
+            if frame is None:
+                return
+            await websocket.send_bytes(frame)
+    
+    async def wait_for_disconnect():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    
+    async with screencasts.watch(session) as viewer:
+        pumps = [asyncio.create_task(send_frames(viewer)), asyncio.create_task(wait_for_disconnect())]
+        try:
+            await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for pump in pumps:
+                pump.cancel()
+            await asyncio.gather(*pumps, return_exceptions=True)
+    try:
+        await websocket.close()
+    except (RuntimeError, WebSocketDisconnect):
+        pass
@@ -1,13 +1,25 @@
 # app/routes/sessions.py
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+import asyncio
+import json
+import aiohttp
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional
+from app.services.admission import AdmissionRejected
 from app.services.browser_manager import browser_manager
+from app.services.jobs import jobs
+from app.services.resource_profiles import get_profile
 from app.repositories.session_repo import SessionRepository
-from app.db import get_repository
+from app.db import get_repository, repository_scope
+from app.models.job_model import CleanupJobResponse, JobInfo
+from app.models.node_model import NodeInfo
 from app.models.session_model import (
     SessionCreateRequest,
+    SessionBatchCreateRequest,
     SessionCreateResponse,
     SessionListResponse,
+    SessionQuery,
     SessionReleaseRequest,
     SessionReleaseResponse,
     SessionInfo,
@@ -17,27 +29,110 @@ from app.models.session_model import (
 router = APIRouter(prefix="/v1/sessions", tags=["sessions"])
 
 
-@router.get("/", response_model=SessionListResponse)
-async def list_sessions(repo: SessionRepository = Depends(get_repository)):
-    """List all active browser sessions."""
-    sessions = await browser_manager.list_sessions(repo)
-    return SessionListResponse(
-        sessions=sessions,
-        total_count=len(sessions)
+def _local_time(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to the naive local time sessions are stored in."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+def session_query(
+    status_filter: Optional[str] = Query(None, alias="status"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000)
+) -> SessionQuery:
+    return SessionQuery(
+        status=status_filter,
+        created_after=_local_time(created_after),
+        created_before=_local_time(created_before),
+        cursor=cursor,
+        limit=limit
     )
 
 
+async def _forward(node: NodeInfo, method: str, path: str, payload: Optional[dict] = None) -> JSONResponse:
+    """Replay a request on the node that should handle it and relay its answer."""
+    try:
+        status_code, body, headers = await browser_manager.cluster.forward(node, method, path, payload)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Node '{node.node_id}' is unreachable: {e}"
+        )
+    return JSONResponse(status_code=status_code, content=body, headers=headers)
+
+
+@router.get("/", response_model=SessionListResponse)
+async def list_sessions(
+    query: SessionQuery = Depends(session_query),
+    repo: SessionRepository = Depends(get_repository)
+):
+    """List active browser sessions, oldest first, one page at a time."""
+    try:
+        return await browser_manager.list_sessions(repo, query)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/export")
+async def export_sessions(query: SessionQuery = Depends(session_query)):
+    """Stream every persisted session matching the filters as NDJSON."""
+    async def stream_sessions():
+        async with repository_scope() as repo:
+            async for session in repo.iter_sessions(query):
+                yield session.model_dump_json() + "\n"
+    
+    return StreamingResponse(stream_sessions(), media_type="application/x-ndjson")
+
+
 @router.post("/", response_model=SessionCreateResponse)
 async def create_session(
     request: SessionCreateRequest,
+    http_request: Request,
     repo: SessionRepository = Depends(get_repository)
 ):
-    """Create a new browser session and return WebSocket URL."""
+    """Create a new browser session and return WebSocket URL.
+    
+    When the API is at capacity the request waits in the admission queue for
+    up to ``wait_timeout`` seconds before giving up with a 503. In cluster
+    mode the session is placed on the least-loaded node.
+    """
+    cluster = browser_manager.cluster
+    if not cluster.enabled or cluster.is_forwarded(http_request.headers):
+        response = await _create_local_session(request, repo)
+        if cluster.enabled:
+            await cluster.report_load()
+        return response
+    
+    node = await cluster.place()
     try:
-        session_info = await browser_manager.create_session(repo, request.session_id)
+        if node and node.node_id != cluster.node_id:
+            return await _forward(node, "POST", "/v1/sessions/", request.model_dump())
+        response = await _create_local_session(request, repo)
+        # Count the session before giving the reservation back
+        await cluster.report_load()
+        return response
+    finally:
+        if node:
+            await cluster.release_reservation(node.node_id)
+
+
+async def _create_local_session(request: SessionCreateRequest, repo: SessionRepository) -> SessionCreateResponse:
+    try:
+        session_info = await browser_manager.create_session(
+            repo,
+            request.session_id,
+            request.mode,
+            priority=request.priority,
+            wait_timeout=request.wait_timeout,
+            profile=request.profile,
+            template=request.template
+        )
         
         if not session_info:
-            if request.session_id and request.session_id in [s.session_id for s in await browser_manager.list_sessions(repo)]:
+            if request.session_id and request.session_id in browser_manager.sessions:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail=f"Session with ID '{request.session_id}' already exists"
@@ -54,11 +149,20 @@ async def create_session(
             cdp_endpoint=session_info.cdp_endpoint,
             cdp_websocket_url=session_info.cdp_websocket_url,
             cdp_discovery_url=session_info.cdp_discovery_url,
+            video_preview_link=session_info.video_preview_link,
             message=f"Session '{session_info.session_id}' created successfully"
         )
-        
+    
     except HTTPException:
         raise
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Unable to create session. {e}",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -69,9 +173,28 @@ async def create_session(
 @router.post("/release", response_model=SessionReleaseResponse)
 async def release_session(
     request: SessionReleaseRequest,
+    http_request: Request,
     repo: SessionRepository = Depends(get_repository)
 ):
-    """Release a browser session."""
+    """Release a browser session, forwarding to its owning node in cluster mode."""
+    cluster = browser_manager.cluster
+    if (
+        cluster.enabled
+        and not cluster.is_forwarded(http_request.headers)
+        and request.session_id not in browser_manager.sessions
+    ):
+        stored = await repo.get(request.session_id)
+        if stored and stored.node_id and stored.node_id != cluster.node_id:
+            node = await cluster.get_node(stored.node_id)
+            if node:
+                return await _forward(node, "POST", "/v1/sessions/release", request.model_dump())
+            # The owning node is gone, and its browsers with it
+            await repo.delete(request.session_id)
+            return SessionReleaseResponse(
+                session_id=request.session_id,
+                message=f"Session '{request.session_id}' released; its node '{stored.node_id}' is offline"
+            )
+    
     try:
         success = await browser_manager.release_session(repo, request.session_id)
         
@@ -85,7 +208,7 @@ async def release_session(
             session_id=request.session_id,
             message=f"Session '{request.session_id}' released successfully"
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -98,9 +221,27 @@ async def release_session(
 @router.get("/{session_id}", response_model=SessionInfo)
 async def get_session(
     session_id: str,
+    http_request: Request,
     repo: SessionRepository = Depends(get_repository)
 ):
-    """Get information about a specific session."""
+    """Get information about a specific session, from its owning node in cluster mode."""
+    cluster = browser_manager.cluster
+    if (
+        cluster.enabled
+        and not cluster.is_forwarded(http_request.headers)
+        and session_id not in browser_manager.sessions
+    ):
+        stored = await repo.get(session_id)
+        if stored and stored.node_id and stored.node_id != cluster.node_id:
+            node = await cluster.get_node(stored.node_id)
+            if node:
+                return await _forward(node, "GET", f"/v1/sessions/{session_id}")
+            # The stored status is stale; the node's browsers went with it
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Session '{session_id}' was on node '{stored.node_id}', which is offline"
+            )
+    
     session_info = await browser_manager.get_session(repo, session_id)
     
     if not session_info:
@@ -112,27 +253,68 @@ async def get_session(
     return session_info
 
 
-@router.post("/multiple", response_model=dict)
-async def create_multiple_browsers(repo: SessionRepository = Depends(get_repository)):
-    """Create 5 browser sessions at once."""
+@router.post("/multiple")
+async def create_multiple_browsers(request: Optional[SessionBatchCreateRequest] = None):
+    """Create several browser sessions concurrently, streaming results as NDJSON."""
+    request = request or SessionBatchCreateRequest()
     try:
-        result = await browser_manager.create_multiple_browsers(repo, count=5)
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create multiple browsers: {str(e)}"
+        get_profile(request.profile)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    async def stream_results():
+        async for result in browser_manager.create_multiple_browsers(request.count, request.profile):
+            yield json.dumps(result, default=str) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.post("/cleanup", response_model=CleanupJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def cleanup_all_sessions(http_request: Request):
+    """Start cleaning up all browser sessions, on every node in cluster mode.
+    
+    Returns at once with a job ID to poll for progress. In cluster mode
+    ``nodes`` holds the job ID each other node started, or null for nodes
+    that could not be reached.
+    """
+    async def run(job):
+        # The job outlives the request scope, so it holds its own repository
+        async with repository_scope() as repo:
+            await browser_manager.cleanup_all(repo, job)
+    
+    job = jobs.start("cleanup", run)
+    nodes = {}
+    cluster = browser_manager.cluster
+    if cluster.enabled and not cluster.is_forwarded(http_request.headers):
+        others = [node for node in await cluster.live_nodes() if node.node_id != cluster.node_id]
+        results = await asyncio.gather(
+            *(cluster.forward(node, "POST", "/v1/sessions/cleanup") for node in others),
+            return_exceptions=True
         )
+        for node, result in zip(others, results):
+            if isinstance(result, Exception) or result[0] >= 400:
+                print(f"Cleanup on node {node.node_id} failed to start: {result}")
+                nodes[node.node_id] = None
+            else:
+                nodes[node.node_id] = result[1]["job_id"]
+    return CleanupJobResponse(
+        job_id=job.job_id,
+        message="Cleanup started",
+        status_url=f"/v1/sessions/cleanup/{job.job_id}",
+        nodes=nodes
+    )
 
 
-@router.post("/cleanup", response_model=dict)
-async def cleanup_all_sessions(repo: SessionRepository = Depends(get_repository)):
-    """Clean up all browser sessions."""
-    try:
-        await browser_manager.cleanup_all(repo)
-        return {"message": "All sessions cleaned up successfully"}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to cleanup sessions: {str(e)}"
-        )
\ No newline at end of file
+@router.get("/cleanup/{job_id}", response_model=JobInfo, responses={404: {"model": ErrorResponse}})
+async def get_cleanup_job(job_id: str, node_id: Optional[str] = None):
+    """Report a cleanup job's progress; ``node_id`` asks the node that runs it."""
+    cluster = browser_manager.cluster
+    if cluster.enabled and node_id and node_id != cluster.node_id:
+        node = await cluster.get_node(node_id)
+        if node is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Node '{node_id}' is not live")
+        return await _forward(node, "GET", f"/v1/sessions/cleanup/{job_id}")
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cleanup job not found")
+    return job.to_info()
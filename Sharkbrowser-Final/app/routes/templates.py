@@ -0,0 +1,56 @@
+# app/routes/templates.py
+from fastapi import APIRouter, HTTPException, status
+from typing import List
+from app.models.template_model import TemplateCaptureRequest, TemplateInfo
+from app.services.browser_manager import browser_manager
+from app.services.profile_templates import TemplateInUse, profile_templates
+
+router = APIRouter(prefix="/v1/templates", tags=["templates"])
+
+
+@router.get("/", response_model=List[TemplateInfo])
+async def list_templates():
+    """List the profile templates sessions can start from."""
+    return profile_templates.list()
+
+
+@router.post("/", response_model=TemplateInfo, status_code=status.HTTP_201_CREATED)
+async def capture_template(request: TemplateCaptureRequest):
+    """Save a running session's browser profile (caches, optionally cookies) as a template.
+    
+    The session must run on the node that receives the request.
+    """
+    try:
+        template = await browser_manager.capture_template(
+            request.session_id,
+            request.name,
+            include_cookies=request.include_cookies,
+            overwrite=request.overwrite
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except (FileExistsError, TemplateInUse) as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to capture template: {str(e)}"
+        )
+    if template is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Session with ID '{request.session_id}' not found"
+        )
+    return template
+
+
+@router.delete("/{name}", response_model=dict)
+async def delete_template(name: str):
+    """Delete a profile template no session on this node is running on."""
+    try:
+        await profile_templates.delete(name)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except TemplateInUse as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {"message": f"Profile template '{name}' deleted"}
@@ -4,6 +4,6 @@ Services Package
 This package contains the core business logic services for the SharkBrowser API.
 """
 
-from . import browser_manager
+from . import docker_client, admission, resource_profiles, profile_templates, backends, browser_session, shared_browser, warm_pool, cluster, jobs, browser_manager, screencast, readiness
 
-__all__ = ["browser_manager"]
+__all__ = ["docker_client", "admission", "resource_profiles", "profile_templates", "backends", "browser_session", "shared_browser", "warm_pool", "cluster", "jobs", "browser_manager", "screencast", "readiness"]
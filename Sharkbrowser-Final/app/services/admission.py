@@ -0,0 +1,175 @@
+# app/services/admission.py
+import asyncio
+import heapq
+import itertools
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from app.config import settings
+from app.utils.host_pressure import host_pressure
+from app.utils.metrics import ADMISSION_QUEUED, ADMISSION_WAIT_SECONDS
+
+
+class AdmissionRejected(Exception):
+    """Raised when a session cannot be admitted before its wait deadline."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Queues session creation until there is room for it.
+
+    Requests are admitted in order of priority, then arrival. A request only
+    overtakes earlier ones whose mode and profile have no room, so a request
+    that could start never waits behind one that cannot, and a request never
+    overtakes an earlier one with the same demand. Room means
+    ``headroom(mode, profile, pending)`` reports capacity beyond what the
+    ``pending`` admitted requests of each demand will take, and host memory
+    and CPU pressure are under their limits.
+    """
+
+    def __init__(
+        self,
+        headroom: Callable[[str, str, Dict[Tuple[str, str], int]], int],
+        on_idle: Optional[Callable[[], None]] = None
+    ):
+        self._headroom = headroom
+        self._on_idle = on_idle
+        self._waiters: List[Tuple[int, int, Tuple[str, str], asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._poller: Optional[asyncio.Task] = None
+        # Admitted requests still acquiring their session, per (mode, profile)
+        self._pending: Counter = Counter()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def admitted(self) -> int:
+        return sum(self._pending.values())
+
+    def overloaded(self) -> Optional[str]:
+        """Describe the host resource over its limit, or None."""
+        memory, cpu = host_pressure.sample()
+        if settings.admission_max_memory_percent > 0 and memory * 100 >= settings.admission_max_memory_percent:
+            return f"host memory at {memory:.0%}"
+        if settings.admission_max_cpu_percent > 0 and cpu * 100 >= settings.admission_max_cpu_percent:
+            return f"host CPU pressure at {cpu:.0%}"
+        return None
+
+    def _has_room(self, demand: Tuple[str, str]) -> bool:
+        return self._headroom(*demand, self._pending) > 0 and self.overloaded() is None
+
+    def _settle(self, demand: Tuple[str, str]):
+        self._pending[demand] -= 1
+        if not self._pending[demand]:
+            del self._pending[demand]
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        mode: str,
+        profile: str,
+        priority: int = 0,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        """Hold an admission slot for one session while it is being acquired."""
+        if timeout is None:
+            timeout = settings.admission_timeout
+        demand = (mode, profile)
+        # Let earlier requests that fit go first
+        self.notify()
+        if not any(waiter[2] == demand for waiter in self._waiters) and self._has_room(demand):
+            self._pending[demand] += 1
+        else:
+            await self._wait(demand, priority, timeout)
+        try:
+            yield
+        finally:
+            self._settle(demand)
+            self.notify()
+
+    async def _wait(self, demand: Tuple[str, str], priority: int, timeout: float):
+        if len(self._waiters) >= settings.admission_max_queue or timeout <= 0:
+            raise AdmissionRejected(self._reason(), settings.admission_retry_after)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (-priority, next(self._sequence), demand, future)
+        heapq.heappush(self._waiters, entry)
+        self._ensure_poller()
+        ADMISSION_QUEUED.inc()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if not future.done():
+                self._remove(entry)
+                raise AdmissionRejected(self._reason(), settings.admission_retry_after)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the caller went away: hand the slot on
+                self._settle(demand)
+                self.notify()
+            else:
+                self._remove(entry)
+            raise
+        finally:
+            ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+    def _remove(self, entry):
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+        entry[3].cancel()
+        # The head may have been what was holding the rest back
+        self.notify()
+
+    def _reason(self) -> str:
+        pressure = self.overloaded()
+        if pressure:
+            return f"Host is under pressure ({pressure})"
+        if self._waiters:
+            return f"Timed out waiting for capacity behind {len(self._waiters)} queued requests"
+        return "Maximum sessions reached or no ports available"
+
+    def notify(self):
+        """Admit queued requests that now fit, e.g. after capacity was freed."""
+        if not self._waiters:
+            # Nothing is waiting or launching any more: let background work use the room
+            if not self.admitted and self._on_idle:
+                self._on_idle()
+            return
+        if self.overloaded() is not None:
+            return
+        blocked = set()
+        admitted = []
+        for entry in sorted(self._waiters):
+            demand, future = entry[2], entry[3]
+            if demand in blocked:
+                continue  # never overtake an earlier request with the same demand
+            # Each admission changes what is left for every demand, so this is not cached
+            if self._headroom(*demand, self._pending) <= 0:
+                blocked.add(demand)
+                continue
+            admitted.append(entry)
+            if not future.done():
+                self._pending[demand] += 1
+                future.set_result(None)
+        if admitted:
+            for entry in admitted:
+                self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+    def _ensure_poller(self):
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+
+    async def _poll(self):
+        # Host pressure changes without any event to hook, so re-check while
+        # anyone is waiting.
+        while self._waiters:
+            await asyncio.sleep(settings.admission_poll_interval)
+            self.notify()
@@ -0,0 +1,29 @@
+"""
+Launch Backends Package
+
+Backends start and stop the Chromium instances behind browser sessions.
+BROWSER_BACKEND selects one: "docker" (a container per browser) or
+"process" (Chromium run directly on the host).
+"""
+
+from app.config import settings
+from .base import BrowserBackend, BrowserEvent, ManagedBrowser
+from .docker_backend import DockerBackend
+from .process_backend import ProcessBackend
+
+BACKENDS = {
+    DockerBackend.name: DockerBackend,
+    ProcessBackend.name: ProcessBackend
+}
+
+
+def create_backend(name: str) -> BrowserBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unsupported BROWSER_BACKEND: {name}")
+    return BACKENDS[name]()
+
+
+# Global launch backend instance
+browser_backend = create_backend(settings.browser_backend)
+
+__all__ = ["BrowserBackend", "BrowserEvent", "ManagedBrowser", "DockerBackend", "ProcessBackend", "browser_backend", "create_backend"]
@@ -0,0 +1,82 @@
+# app/services/backends/base.py
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+from pydantic import BaseModel
+
+
+class ManagedBrowser(BaseModel):
+    """A browser found running by ``BrowserBackend.discover``."""
+    handle: str
+    name: str
+    profile: Optional[str] = None
+    cdp_host: Optional[str] = None  # None when the API cannot reach its CDP server
+    cdp_port: Optional[int] = None
+    template: Optional[str] = None
+    template_layer: Optional[str] = None
+
+
+class BrowserEvent(BaseModel):
+    """A browser exiting or restarting without the API asking it to."""
+    handle: str
+    action: str  # "exited" or "restarted"
+    exit_code: Optional[int] = None
+    oom: bool = False
+
+
+class BrowserBackend(ABC):
+    """Starts and stops the Chromium instance behind a ``BrowserSession``.
+
+    ``launch`` fills in the session's ``container_id`` (an opaque handle for
+    the backend), ``cdp_host`` and ``cdp_port`` and returns the browser's
+    /json/version payload once CDP is reachable.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def launch(self, session) -> Dict:
+        pass
+
+    @abstractmethod
+    async def stop(self, session):
+        pass
+
+    @abstractmethod
+    async def running(self) -> Set[str]:
+        """Handles of every browser this backend still has running."""
+        pass
+
+    async def rename(self, session, name: str):
+        """Give a browser a new human-readable name, where the backend has one."""
+        pass
+
+    async def discover(self) -> List[ManagedBrowser]:
+        """Browsers started for this node by an earlier API process.
+
+        Backends whose browsers cannot outlive the API return nothing.
+        """
+        return []
+
+    async def remove(self, handle: str):
+        """Stop a browser known only by its handle, e.g. one from ``discover``."""
+        pass
+
+    async def capture_profile(self, session, destination: str, exclude: List[str]):
+        """Copy a running browser's user data dir into ``destination``.
+
+        ``exclude`` holds file name patterns to leave out.
+        """
+        raise NotImplementedError(f"The {self.name} backend cannot capture profiles")
+
+    def readiness_checks(self) -> Dict[str, Callable[[], Awaitable[None]]]:
+        """Named probes for ``/ready``; each raises if browsers cannot be launched."""
+        return {}
+
+    async def watch(self) -> AsyncIterator[BrowserEvent]:
+        """Stream browser exits and restarts as they happen.
+
+        Ends without yielding for backends that cannot report events; raises
+        when an event stream that should run forever is lost.
+        """
+        return
+        yield
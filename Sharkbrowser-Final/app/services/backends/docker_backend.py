@@ -0,0 +1,300 @@
+# app/services/backends/docker_backend.py
+import asyncio
+import tarfile
+import tempfile
+import threading
+import time
+import docker
+from docker.types import DriverConfig, Mount
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+from app.config import settings
+from app.services.backends.base import BrowserBackend, BrowserEvent, ManagedBrowser
+from app.services.docker_client import docker_client
+from app.services.profile_templates import profile_templates
+from app.services.resource_profiles import get_profile
+from app.utils.cdp_helper import wait_for_cdp
+
+# Labels on every browser container, so a restarted API can find its own
+LABEL_MANAGED = "sharkbrowser.managed"
+LABEL_NODE = "sharkbrowser.node"
+LABEL_PROFILE = "sharkbrowser.profile"
+LABEL_PORT = "sharkbrowser.port"
+LABEL_TEMPLATE = "sharkbrowser.template"
+LABEL_TEMPLATE_LAYER = "sharkbrowser.template-layer"
+
+# Built from chromium-cdp.Dockerfile
+BROWSER_IMAGE = "chromium-cdp"
+# Where a profile template's overlay is mounted in the container
+TEMPLATE_MOUNT = "/profile"
+# Chromium's own default as the image's chrome user
+DEFAULT_USER_DATA_DIR = "/home/chrome/.config/chromium"
+# Refuse archive members that escape the destination, where Python supports it
+SAFE_EXTRACT = {"filter": "tar"} if hasattr(tarfile, "tar_filter") else {}
+
+
+class DockerBackend(BrowserBackend):
+    """Runs each browser in its own ``chromium-cdp`` container."""
+
+    name = "docker"
+
+    @staticmethod
+    def _owner_filter() -> List[str]:
+        """Label filter matching the containers this node manages.
+
+        Outside cluster mode the node ID is derived from the hostname, which
+        changes whenever the API container is recreated, so it is not used.
+        """
+        labels = [f"{LABEL_MANAGED}=true"]
+        if settings.cluster_enabled:
+            labels.append(f"{LABEL_NODE}={settings.cluster_node_id}")
+        return labels
+
+    @staticmethod
+    def _labels(session) -> Dict[str, str]:
+        labels = {
+            LABEL_MANAGED: "true",
+            LABEL_NODE: settings.cluster_node_id,
+            LABEL_PROFILE: session.profile,
+            LABEL_PORT: str(session.port)
+        }
+        if session.template_layer:
+            labels[LABEL_TEMPLATE] = session.template
+            labels[LABEL_TEMPLATE_LAYER] = session.template_layer
+        return labels
+
+    @staticmethod
+    def _user_data_dir(session) -> str:
+        if session.template:
+            return TEMPLATE_MOUNT
+        return get_profile(session.profile).user_data_dir or DEFAULT_USER_DATA_DIR
+
+    async def _mount_template(self, session) -> Mount:
+        """An overlay volume with the template as its read-only lower layer.
+
+        Nothing is copied, so this takes the same time for any template size.
+        """
+        # Layers left behind by a browser that died under this session
+        await self._release_template(session)
+        lower, upper, work = await asyncio.to_thread(profile_templates.mount_layers, session)
+        return Mount(
+            target=TEMPLATE_MOUNT,
+            source=None,
+            type="volume",
+            no_copy=True,
+            driver_config=DriverConfig("local", {
+                "type": "overlay",
+                "device": "overlay",
+                "o": f"lowerdir={lower},upperdir={upper},workdir={work}"
+            })
+        )
+
+    async def _release_template(self, session):
+        if not session.template_layer:
+            return
+        if session.container_id:
+            # The overlay must be unmounted before its layers are removed
+            await self.remove(session.container_id)
+        await asyncio.to_thread(profile_templates.unmount_layers, session)
+
+    async def launch(self, session) -> Dict:
+        phase_start = time.perf_counter()
+        client = await docker_client.get_client()
+        mounts = []
+        if session.template:
+            mounts.append(await self._mount_template(session))
+            session.timings["template_mount"] = time.perf_counter() - phase_start
+            phase_start = time.perf_counter()
+        run_kwargs = get_profile(session.profile).container_options(TEMPLATE_MOUNT if mounts else None)
+        if mounts:
+            run_kwargs["mounts"] = mounts
+        environment = {"DISPLAY": ":99", **run_kwargs.pop("environment", {})}
+        if settings.docker_network:
+            run_kwargs["network"] = settings.docker_network
+        if not settings.gateway_mode:
+            run_kwargs["ports"] = {"9222/tcp": session.port}
+        container = await docker_client.run(
+            client.containers.run,
+            BROWSER_IMAGE,
+            detach=True,
+            name=f"browser-{session.session_id}",
+            remove=True,
+            labels=self._labels(session),
+            environment=environment,
+            **run_kwargs
+        )
+        session.container_id = container.id
+        if settings.docker_network:
+            await docker_client.run(container.reload)
+            networks = container.attrs["NetworkSettings"]["Networks"]
+            session.cdp_host = networks[settings.docker_network]["IPAddress"]
+            session.cdp_port = 9222
+        session.timings["container_run"] = time.perf_counter() - phase_start
+        
+        phase_start = time.perf_counter()
+        try:
+            version = await wait_for_cdp(session.cdp_port, host=session.cdp_host, timeout=settings.cdp_timeout)
+        except asyncio.TimeoutError:
+            await docker_client.run(container.reload)
+            print(f"Container {session.container_id} CDP not ready after {settings.cdp_timeout}s. Status: {container.status}")
+            raise
+        session.timings["cdp_ready"] = time.perf_counter() - phase_start
+        return version
+
+    async def stop(self, session):
+        if session.container_id:
+            client = await docker_client.get_client()
+            try:
+                # Browsers run with auto-remove, so one stop or kill call is enough
+                if settings.browser_stop_timeout > 0:
+                    await docker_client.run(client.api.stop, session.container_id, timeout=settings.browser_stop_timeout)
+                else:
+                    await docker_client.run(client.api.kill, session.container_id)
+                print(f"Stopped container {session.container_id}")
+            except docker.errors.NotFound:
+                print(f"Container {session.container_id} not found")
+            except Exception as e:
+                print(f"Error stopping container {session.container_id}: {e}")
+        await self._release_template(session)
+
+    async def capture_profile(self, session, destination: str, exclude: List[str]):
+        client = await docker_client.get_client()
+        await docker_client.run(
+            self.copy_profile_out, client, session.container_id, self._user_data_dir(session), destination, exclude
+        )
+
+    @staticmethod
+    def copy_profile_out(client: docker.DockerClient, container_id: str, source: str, destination: str, exclude: List[str]):
+        """Stream a directory out of a running container with tar and unpack it.
+
+        Unlike ``get_archive`` this also sees tmpfs mounts.
+        """
+        command = ["tar", "-C", source, "-cf", "-", *(f"--exclude={pattern}" for pattern in exclude), "."]
+        exec_id = client.api.exec_create(container_id, command, stdout=True, stderr=False)["Id"]
+        with tempfile.TemporaryFile() as archive:
+            for chunk in client.api.exec_start(exec_id, stream=True):
+                archive.write(chunk)
+            exit_code = client.api.exec_inspect(exec_id)["ExitCode"]
+            # 1 only means files changed while being read, expected in a live profile
+            if exit_code not in (0, 1):
+                raise RuntimeError(f"tar in container {container_id} exited with code {exit_code}")
+            archive.seek(0)
+            with tarfile.open(fileobj=archive) as tar:
+                # The archive comes from a browser that ran untrusted pages
+                tar.extractall(destination, **SAFE_EXTRACT)
+
+    async def _list_managed(self) -> list:
+        client = await docker_client.get_client()
+        # Sparse listing is a single API call instead of one inspect per container
+        return await docker_client.run(client.containers.list, sparse=True, filters={"label": self._owner_filter()})
+
+    async def running(self) -> Set[str]:
+        return {container.id for container in await self._list_managed()}
+
+    async def discover(self) -> List[ManagedBrowser]:
+        browsers = []
+        for container in await self._list_managed():
+            labels = container.attrs.get("Labels") or {}
+            if settings.docker_network:
+                networks = (container.attrs.get("NetworkSettings") or {}).get("Networks") or {}
+                cdp_host = (networks.get(settings.docker_network) or {}).get("IPAddress") or None
+                cdp_port = 9222
+            else:
+                cdp_host = "localhost"
+                cdp_port = int(labels[LABEL_PORT]) if labels.get(LABEL_PORT, "").isdigit() else None
+            browsers.append(ManagedBrowser(
+                handle=container.id,
+                name=container.attrs["Names"][0].lstrip("/"),
+                profile=labels.get(LABEL_PROFILE),
+                cdp_host=cdp_host if cdp_port else None,
+                cdp_port=cdp_port,
+                template=labels.get(LABEL_TEMPLATE),
+                template_layer=labels.get(LABEL_TEMPLATE_LAYER)
+            ))
+        return browsers
+
+    async def remove(self, handle: str):
+        """Remove a container and wait until it is gone, so its name can be reused."""
+        client = await docker_client.get_client()
+        try:
+            await docker_client.run(client.api.remove_container, handle, force=True, v=True)
+        except docker.errors.NotFound:
+            pass
+        except docker.errors.APIError as e:
+            if e.status_code != 409:
+                raise
+            # Already being removed, e.g. by auto-remove after the container died
+            try:
+                await docker_client.run(client.api.wait, handle, timeout=10, condition="removed")
+            except docker.errors.NotFound:
+                pass
+
+    def readiness_checks(self) -> Dict[str, Callable[[], Awaitable[None]]]:
+        return {"docker": self._check_daemon, "image": self._check_image}
+
+    @staticmethod
+    async def _check_daemon():
+        client = await docker_client.get_client()
+        await docker_client.run(client.ping)
+
+    @staticmethod
+    async def _check_image():
+        client = await docker_client.get_client()
+        try:
+            await docker_client.run(client.images.get, BROWSER_IMAGE)
+        except docker.errors.ImageNotFound:
+            raise RuntimeError(f"Image '{BROWSER_IMAGE}' is not on this host")
+
+    async def watch(self) -> AsyncIterator[BrowserEvent]:
+        client = await docker_client.get_client()
+        stream = await docker_client.run(client.events, decode=True, filters={
+            "type": "container",
+            "event": ["oom", "die", "restart"],
+            "label": self._owner_filter()
+        })
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def pump():
+            # The stream blocks forever, so it gets its own thread rather than a pool worker
+            try:
+                for event in stream:
+                    loop.call_soon_threadsafe(queue.put_nowait, event)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            else:
+                loop.call_soon_threadsafe(queue.put_nowait, ConnectionError("Docker event stream ended"))
+        
+        threading.Thread(target=pump, name="docker-events", daemon=True).start()
+        oom_killed: Set[str] = set()
+        try:
+            while True:
+                event = await queue.get()
+                if isinstance(event, Exception):
+                    raise event
+                handle, action = event.get("id"), event.get("Action")
+                if action == "oom":
+                    # A renderer may be OOM-killed without the browser dying; wait for "die"
+                    oom_killed.add(handle)
+                elif action == "die":
+                    exit_code: Optional[str] = event.get("Actor", {}).get("Attributes", {}).get("exitCode")
+                    yield BrowserEvent(
+                        handle=handle,
+                        action="exited",
+                        exit_code=int(exit_code) if exit_code and exit_code.lstrip("-").isdigit() else None,
+                        oom=handle in oom_killed
+                    )
+                    oom_killed.discard(handle)
+                elif action == "restart":
+                    yield BrowserEvent(handle=handle, action="restarted")
+        finally:
+            stream.close()
+
+    async def rename(self, session, name: str):
+        if not session.container_id:
+            return
+        try:
+            client = await docker_client.get_client()
+            container = await docker_client.run(client.containers.get, session.container_id)
+            await docker_client.run(container.rename, name)
+        except Exception as e:
+            print(f"Failed to rename container {session.container_id}: {e}")
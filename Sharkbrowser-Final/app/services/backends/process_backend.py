@@ -0,0 +1,197 @@
+# app/services/backends/process_backend.py
+import asyncio
+import os
+import re
+import shutil
+import signal
+import tempfile
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Set, Tuple
+from urllib.parse import urlparse
+from app.config import settings
+from app.services.backends.base import BrowserBackend, BrowserEvent
+from app.services.profile_templates import profile_templates
+from app.services.resource_profiles import get_profile
+
+DEVTOOLS_LISTENING = re.compile(r"DevTools listening on (ws://\S+)")
+
+
+class ProcessBackend(BrowserBackend):
+    """Runs Chromium directly on the host, one process per browser.
+
+    There is no container to create or port to publish: Chromium binds its
+    debugging port itself and prints the browser WebSocket URL on stderr,
+    which is all the API needs. Each browser gets a throwaway user data dir
+    on tmpfs, cloned from its profile template if it has one. Container
+    limits from resource profiles do not apply; their Chromium flags do.
+    """
+
+    name = "process"
+
+    def __init__(self):
+        self.processes: Dict[str, Tuple[asyncio.subprocess.Process, str, asyncio.Task]] = {}
+        self.exits: asyncio.Queue = asyncio.Queue()
+
+    @property
+    def user_data_root(self) -> str:
+        if settings.process_user_data_dir:
+            return settings.process_user_data_dir
+        return "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+    def _command(self, session, user_data_dir: str) -> list:
+        if settings.gateway_mode:
+            # Only the API talks to the browser; let Chromium pick a free port
+            address, port = "127.0.0.1", 0
+        else:
+            address, port = "0.0.0.0", session.port
+        command = [
+            settings.chromium_path,
+            "--headless",
+            "--disable-gpu",
+            f"--remote-debugging-address={address}",
+            f"--remote-debugging-port={port}",
+            f"--user-data-dir={user_data_dir}"
+        ]
+        if os.geteuid() == 0:
+            # Chromium refuses to start as root with its sandbox enabled
+            command.append("--no-sandbox")
+        return command + get_profile(session.profile).chromium_flags() + ["about:blank"]
+
+    async def launch(self, session) -> Dict:
+        phase_start = time.perf_counter()
+        user_data_dir = tempfile.mkdtemp(prefix="sharkbrowser-", dir=self.user_data_root)
+        try:
+            if session.template:
+                await self._copy_template(session.template, user_data_dir)
+                session.timings["template_copy"] = time.perf_counter() - phase_start
+                phase_start = time.perf_counter()
+            process = await asyncio.create_subprocess_exec(
+                *self._command(session, user_data_dir),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+        except Exception:
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+        handle = f"process-{process.pid}"
+        session.container_id = handle
+        session.timings["process_start"] = time.perf_counter() - phase_start
+
+        phase_start = time.perf_counter()
+        try:
+            websocket_url = await asyncio.wait_for(self._read_websocket_url(process), settings.cdp_timeout)
+        except BaseException:
+            await self._terminate(process)
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+        # Keep reading stderr so a chatty browser never blocks on a full pipe
+        drain = asyncio.create_task(self._drain(handle, process))
+        self.processes[handle] = (process, user_data_dir, drain)
+
+        endpoint = urlparse(websocket_url)
+        session.cdp_host = "127.0.0.1"
+        session.cdp_port = endpoint.port
+        session.timings["cdp_ready"] = time.perf_counter() - phase_start
+        return {"webSocketDebuggerUrl": websocket_url}
+
+    @staticmethod
+    async def _copy_template(template: str, user_data_dir: str):
+        # With reflinks (btrfs, XFS) this is a copy-on-write clone, not a full copy
+        process = await asyncio.create_subprocess_exec(
+            "cp", "-a", "--reflink=auto", f"{profile_templates.path(template)}/.", user_data_dir,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, error = await process.communicate()
+        if process.returncode:
+            raise RuntimeError(f"Copying profile template '{template}' failed: {error.decode(errors='replace').strip()}")
+
+    @staticmethod
+    async def _read_websocket_url(process: asyncio.subprocess.Process) -> str:
+        output = []
+        while True:
+            line = await process.stderr.readline()
+            if not line:
+                raise RuntimeError(
+                    f"Chromium exited with code {await process.wait()} before CDP was ready: "
+                    + " ".join(output[-5:])
+                )
+            text = line.decode(errors="replace").strip()
+            match = DEVTOOLS_LISTENING.search(text)
+            if match:
+                return match.group(1)
+            output.append(text)
+
+    async def _drain(self, handle: str, process: asyncio.subprocess.Process):
+        while await process.stderr.readline():
+            pass
+        exit_code = await process.wait()
+        if handle in self.processes:
+            # Still tracked, so the browser exited on its own rather than through stop()
+            self.exits.put_nowait(BrowserEvent(handle=handle, action="exited", exit_code=exit_code))
+
+    @staticmethod
+    async def _terminate(process: asyncio.subprocess.Process):
+        if process.returncode is not None:
+            return
+        # Chromium's renderer and GPU processes share its process group
+        try:
+            if settings.browser_stop_timeout <= 0:
+                raise asyncio.TimeoutError
+            os.killpg(process.pid, signal.SIGTERM)
+            await asyncio.wait_for(process.wait(), settings.browser_stop_timeout)
+        except asyncio.TimeoutError:
+            os.killpg(process.pid, signal.SIGKILL)
+            await process.wait()
+        except ProcessLookupError:
+            pass
+
+    async def stop(self, session):
+        await self.remove(session.container_id)
+
+    async def remove(self, handle: str):
+        """Stop a browser process if it still runs and delete its user data dir."""
+        entry = self.processes.pop(handle, None)
+        if not entry:
+            return
+        process, user_data_dir, drain = entry
+        try:
+            await self._terminate(process)
+            print(f"Stopped browser process {process.pid}")
+        except Exception as e:
+            print(f"Error stopping browser process {process.pid}: {e}")
+        finally:
+            drain.cancel()
+            await asyncio.to_thread(shutil.rmtree, user_data_dir, True)
+
+    async def capture_profile(self, session, destination: str, exclude: List[str]):
+        entry = self.processes.get(session.container_id)
+        if not entry:
+            raise RuntimeError(f"Browser process for session {session.session_id} is not running")
+        await asyncio.to_thread(self._copy_profile, entry[1], destination, exclude)
+
+    @staticmethod
+    def _copy_profile(source: str, destination: str, exclude: List[str]):
+        try:
+            shutil.copytree(source, destination, symlinks=True, ignore=shutil.ignore_patterns(*exclude), dirs_exist_ok=True)
+        except shutil.Error as e:
+            # Files Chromium deleted while they were being copied
+            print(f"Skipped {len(e.args[0])} files while capturing {source}")
+
+    def readiness_checks(self) -> Dict[str, Callable[[], Awaitable[None]]]:
+        return {"chromium": self._check_chromium}
+
+    @staticmethod
+    async def _check_chromium():
+        if not shutil.which(settings.chromium_path):
+            raise RuntimeError(f"Chromium not found at '{settings.chromium_path}'")
+
+    async def running(self) -> Set[str]:
+        return {handle for handle, (process, _, _) in self.processes.items() if process.returncode is None}
+
+    async def watch(self) -> AsyncIterator[BrowserEvent]:
+        while True:
+            yield await self.exits.get()
@@ -1,285 +1,833 @@
 # app/services/browser_manager.py
 import asyncio
+import time
 import uuid
-import json
 import aiohttp
-import docker
-import re
-import time
-import requests
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, Union
 from app.config import settings
+from app.db import repository_scope
+from app.models.session_model import SessionInfo, SessionListResponse, SessionQuery
+from app.models.template_model import TemplateInfo
+from app.repositories.session_repo import SessionRepository, decode_cursor, encode_cursor
+from app.services.admission import AdmissionController, AdmissionRejected
+from app.services.browser_session import BrowserSession, allocate_port
+from app.services.cluster import ClusterNode
+from app.services.jobs import Job
+from app.services.profile_templates import profile_templates
+from app.services.resource_profiles import get_profile
+from app.services.backends import BrowserEvent, ManagedBrowser, browser_backend
+from app.services.shared_browser import ContextSession, SharedBrowser
+from app.services.warm_pool import WarmPool
+from app.utils.metrics import (
+    BROWSER_EXITS,
+    BROWSERS_RECYCLED,
+    SESSION_CLEANUP_SECONDS,
+    SESSION_CREATE_FAILURES,
+    SESSION_CREATE_PHASE_SECONDS,
+    SESSION_CREATE_SECONDS,
+    SESSION_RELEASE_SECONDS,
+    SESSIONS_CLOSED,
+    SESSIONS_CREATED,
+    SESSIONS_REPLACED
+)
+from app.utils.cdp_helper import wait_for_cdp
 from app.utils.port_helper import port_allocator
-from app.models.session_model import SessionInfo
-from app.repositories.session_repo import SessionRepository
 
 
-class BrowserSession:
-    """Represents a single browser session."""
-    
-    def __init__(self, session_id: str, port: int):
-        self.session_id = session_id
-        self.port = port
-        self.created_at = datetime.now()
-        self.status = "starting"
-        self.cdp_websocket_url: Optional[str] = None
-        self.container_id: Optional[str] = None
-        self.browser_id: Optional[str] = None
+class BrowserManager:
+    """Manages browser sessions and their lifecycle.
     
-    @property
-    def cdp_endpoint(self) -> str:
-        if self.cdp_websocket_url:
-            return self.cdp_websocket_url
-        return f"ws://localhost:{self.port}"
+    ``sessions`` is the source of truth for this process: reads are served from
+    it and every change is written through to the repository, which is only
+    read for sessions this process does not own.
+    """
+    
+    def __init__(self):
+        self.sessions: Dict[str, Union[BrowserSession, ContextSession]] = {}
+        self.shared_browsers: List[SharedBrowser] = []
+        self.start_time = datetime.now()
+        self.launching = 0
+        self.warm_pool = WarmPool(self._pool_has_capacity)
+        self.admission = AdmissionController(self.admission_headroom, self.warm_pool.notify)
+        self.cluster = ClusterNode(lambda: len(self.sessions))
+        self._tasks: List[asyncio.Task] = []
+        self._event_tasks: Set[asyncio.Task] = set()
+        self._batches: Set[asyncio.Task] = set()
     
     @property
-    def uptime_seconds(self) -> int:
-        return int((datetime.now() - self.created_at).total_seconds())
+    def total_browsers(self) -> int:
+        """Containers counted against max_browsers: dedicated, shared, launching and pooled."""
+        dedicated = sum(1 for session in self.sessions.values() if not isinstance(session, ContextSession))
+        return dedicated + len(self.shared_browsers) + self.launching + self.warm_pool.size
     
-    def get_public_ip(self) -> str:
-        try:
-            response = requests.get('http://169.254.169.254/latest/meta-data/public-ipv4', timeout=2)
-            if response.status_code == 200:
-                return response.text.strip()
-        except:
-            pass
-        
-        try:
-            response = requests.get('https://api.ipify.org', timeout=5)
-            if response.status_code == 200:
-                return response.text.strip()
-        except:
-            pass
-        
-        return "localhost"
+    def has_capacity(self) -> bool:
+        return self.total_browsers < settings.max_browsers
     
-    async def get_cdp_websocket_url(self, container) -> Optional[str]:
-        try:
-            await asyncio.sleep(3)
-            logs = container.logs().decode("utf-8")
-            print(f"Container logs: {logs}")
-            
-            patterns = [
-                r"ws://.*?/devtools/browser/([a-z0-9\-]+)",
-                r"/devtools/browser/([a-z0-9\-]+)",
-                r"browser/([a-z0-9\-]+)",
-                r"Browser ID: ([a-z0-9\-]+)"
-            ]
-            
-            browser_id = None
-            for pattern in patterns:
-                match = re.search(pattern, logs)
-                if match:
-                    browser_id = match.group(1)
-                    break
-            
-            if browser_id:
-                self.browser_id = browser_id
-                public_ip = self.get_public_ip()
-                websocket_url = f"ws://{public_ip}:{self.port}/devtools/browser/{browser_id}"
-                return websocket_url
-            
-            try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(f"http://localhost:{self.port}/json") as response:
-                        if response.status == 200:
-                            tabs = await response.json()
-                            if tabs and len(tabs) > 0:
-                                websocket_url = tabs[0].get('webSocketDebuggerUrl')
-                                if websocket_url:
-                                    public_ip = self.get_public_ip()
-                                    websocket_url = websocket_url.replace('localhost', public_ip)
-                                    return websocket_url
-            except Exception as e:
-                print(f"Failed to query CDP discovery endpoint: {e}")
-                
-        except Exception as e:
-            print(f"Failed to get CDP WebSocket URL: {e}")
-        return None
+    def _pool_has_capacity(self) -> bool:
+        # Don't pre-start browsers on a host that is already short of memory or
+        # CPU, or take capacity that queued or admitted requests are waiting for
+        return (
+            self.has_capacity()
+            and not self.admission.queued
+            and not self.admission.admitted
+            and self.admission.overloaded() is None
+        )
     
-    async def start(self) -> bool:
-        try:
-            client = docker.from_env()
-            container = client.containers.run(
-                "chromium-cdp",
-                detach=True,
-                ports={"9222/tcp": self.port},
-                name=f"browser-{self.session_id}",
-                remove=True,
-                environment={"DISPLAY": ":99"}
+    def admission_headroom(self, mode: str, profile: str, pending: Dict[Tuple[str, str], int]) -> int:
+        """How many more sessions of ``mode`` and ``profile`` could be started right now.
+        
+        ``pending`` counts sessions per (mode, profile) already admitted but
+        not placed yet. Dedicated sessions take a container each; context
+        sessions fill free slots in shared containers of their profile first
+        and need a new container per CONTEXTS_PER_CONTAINER after that. Idle
+        pool browsers count as free containers: default-profile sessions take
+        them over and other launches evict them.
+        """
+        idle = len(self.warm_pool.idle)
+        new_containers = settings.max_browsers - self.total_browsers + idle
+        if not settings.gateway_mode:
+            new_containers = min(new_containers, port_allocator.get_available_count(recheck=True) + idle)
+        
+        def free_slots(slot_profile: str) -> int:
+            return sum(
+                max(shared.free_slots, 0) for shared in self.shared_browsers
+                if shared.profile == slot_profile and (shared.active or not shared.ready.is_set())
             )
-            self.container_id = container.id
-            await asyncio.sleep(2)
-            container.reload()
-            if container.status != 'running':
-                print(f"Container {self.container_id} is not running. Status: {container.status}")
-                self.status = "error"
-                return False
-            
-            self.cdp_websocket_url = await self.get_cdp_websocket_url(container)
-            self.status = "active"
-            return True
-            
-        except Exception as e:
-            print(f"Failed to start browser session {self.session_id}: {e}")
-            self.status = "error"
-            await self.cleanup()
-            return False
+        
+        # Context slots left over in containers promised to pending context sessions
+        spare_slots = 0
+        for (pending_mode, pending_profile), count in pending.items():
+            if pending_mode != "context":
+                new_containers -= count
+                continue
+            overflow = count - free_slots(pending_profile)
+            if overflow > 0:
+                new_containers -= -(-overflow // settings.contexts_per_container)
+                if pending_profile == profile:
+                    spare_slots = -overflow % settings.contexts_per_container
+            elif pending_profile == profile:
+                spare_slots = -overflow
+        new_containers = max(new_containers, 0)
+        if mode == "context":
+            if ("context", profile) not in pending:
+                spare_slots = free_slots(profile)
+            return spare_slots + new_containers * settings.contexts_per_container
+        return new_containers
     
-    async def cleanup(self):
-        try:
-            if self.container_id:
-                client = docker.from_env()
-                try:
-                    container = client.containers.get(self.container_id)
-                    container.stop(timeout=5)
-                    container.remove()
-                    print(f"Stopped and removed container {self.container_id}")
-                except docker.errors.NotFound:
-                    print(f"Container {self.container_id} not found")
-                except Exception as e:
-                    print(f"Error stopping container {self.container_id}: {e}")
-        except Exception as e:
-            print(f"Error during cleanup for session {self.session_id}: {e}")
-        finally:
-            port_allocator.release_port(self.port)
-            self.status = "closed"
-
-
-class BrowserManager:
-    """Manages browser sessions and their lifecycle."""
+    def start(self):
+        """Start background work such as warm pool refills and session expiry."""
+        # The pool only serves dedicated browsers, which context mode never asks for
+        if settings.session_mode != "context":
+            self.warm_pool.start()
+        self.cluster.start()
+        if self._tasks:
+            return
+        if settings.session_sync_interval > 0:
+            self._tasks.append(asyncio.create_task(self._sync_loop()))
+        if settings.browser_events_enabled:
+            self._tasks.append(asyncio.create_task(self._events_loop()))
+        if settings.session_idle_timeout > 0 or settings.session_max_lifetime > 0:
+            self._tasks.append(asyncio.create_task(self._reaper_loop()))
     
-    def __init__(self):
-        self.sessions: Dict[str, BrowserSession] = {}  # Keep for cleanup
-        self.start_time = datetime.now()
+    async def stop(self):
+        """Stop background work and drain the warm pool."""
+        for task in [*self._tasks, *self._event_tasks]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._event_tasks, return_exceptions=True)
+        self._tasks.clear()
+        # Batches are left to finish so every browser they launched gets its row
+        if self._batches:
+            await asyncio.wait(self._batches)
+        await self.warm_pool.stop()
+        await self.cluster.stop()
     
-    async def create_session(self, repo: SessionRepository, session_id: Optional[str] = None) -> Optional[SessionInfo]:
-        if len(self.sessions) >= settings.max_browsers:
+    async def reconcile(self, repo: SessionRepository) -> Tuple[int, int, int]:
+        """Pick up where a previous API process left off.
+        
+        Lists this node's browsers in one backend call, matches them against
+        their repository rows in one query and re-adopts every dedicated
+        browser whose session still exists and answers CDP. Everything else
+        is removed: pool and shared browsers (context sessions cannot be
+        re-attached), browsers without a row, and rows without a browser.
+        Must run before ``start`` so nothing is launching yet. Returns the
+        number of adopted sessions, removed browsers and deleted rows.
+        """
+        browsers = await browser_backend.discover()
+        by_session = {
+            browser.name[len("browser-"):]: browser for browser in browsers
+            if browser.name.startswith("browser-") and browser.cdp_host
+        }
+        rows = await repo.get_many(list(by_session))
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2)) as http:
+            candidates = await asyncio.gather(*(
+                self._adopt(http, row, by_session[row.session_id]) for row in rows
+            ))
+        adopted = [session for session in candidates if session]
+        for session in adopted:
+            self.sessions[session.session_id] = session
+        # The advertised host may have changed since the rows were written
+        links = {row.session_id: row.video_preview_link for row in rows}
+        for session in adopted:
+            if links[session.session_id] != session.preview_url:
+                await repo.update_video_preview(session.session_id, session.preview_url)
+        
+        kept = {session.container_id for session in adopted}
+        orphans = [browser.handle for browser in browsers if browser.handle not in kept]
+        results = await asyncio.gather(*(browser_backend.remove(handle) for handle in orphans), return_exceptions=True)
+        for handle, result in zip(orphans, results):
+            if isinstance(result, Exception):
+                print(f"Failed to remove orphaned browser {handle}: {result}")
+        
+        node_id = self.cluster.node_id if self.cluster.enabled else None
+        stale = await repo.delete_except([session.session_id for session in adopted], node_id)
+        await asyncio.to_thread(
+            profile_templates.prune,
+            {session.template_layer for session in adopted if session.template_layer}
+        )
+        return len(adopted), len(orphans), stale
+    
+    async def _adopt(self, http: aiohttp.ClientSession, row: SessionInfo, browser: ManagedBrowser) -> Optional[BrowserSession]:
+        """Rebuild a ``BrowserSession`` around a running browser, if it is healthy."""
+        try:
+            async with http.get(f"http://{browser.cdp_host}:{browser.cdp_port}/json/version") as response:
+                version = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return None
+        if not isinstance(version, dict) or not version.get("webSocketDebuggerUrl"):
             return None
+        if not settings.gateway_mode and not port_allocator.reserve_port(row.port, row.session_id):
+            return None
+        
+        session = BrowserSession(row.session_id, row.port, browser.profile, browser.template)
+        session.template_layer = browser.template_layer
+        profile_templates.adopt_layers(session)
+        session.container_id = browser.handle
+        session.cdp_host = browser.cdp_host
+        session.cdp_port = browser.cdp_port
+        session.created_at = row.created_at
+        await session.get_cdp_websocket_url(version)
+        session.status = "active"
+        return session
+    
+    async def create_session(
+        self,
+        repo: SessionRepository,
+        session_id: Optional[str] = None,
+        mode: Optional[str] = None,
+        priority: int = 0,
+        wait_timeout: Optional[float] = None,
+        profile: Optional[str] = None,
+        template: Optional[str] = None
+    ) -> Optional[SessionInfo]:
+        """Create a session, queueing for capacity for up to ``wait_timeout`` seconds.
         
+        Raises ``AdmissionRejected`` when no capacity frees up in time and
+        ``ValueError`` for an unknown resource profile or profile template, or
+        for a context session outside gateway mode.
+        """
         if not session_id:
             session_id = str(uuid.uuid4())
         
         if session_id in self.sessions:
             return None
         
-        port = port_allocator.get_available_port()
-        if not port:
-            return None
+        mode = mode or settings.session_mode
+        profile = profile or settings.default_profile
+        get_profile(profile)
+        if mode == "context" and not settings.gateway_mode:
+            # Without the gateway every tenant could reach the shared debugging port
+            raise ValueError("Context sessions need the CDP gateway (CDP_GATEWAY_ENABLED with DOCKER_NETWORK)")
+        if template:
+            if mode == "context":
+                raise ValueError("Profile templates need container mode; context sessions share a profile")
+            profile_templates.get(template)
+        try:
+            async with self.admission.admit(mode, profile, priority, wait_timeout):
+                # The same ID may have been created while this request was queued
+                if session_id in self.sessions:
+                    return None
+                started = time.perf_counter()
+                if mode == "context":
+                    session = await self._acquire_context(session_id, profile)
+                else:
+                    session = await self._acquire_browser(session_id, profile, template)
+                if not session:
+                    SESSION_CREATE_FAILURES.labels("launch").inc()
+                    return None
+                self.sessions[session_id] = session
+        except AdmissionRejected:
+            SESSION_CREATE_FAILURES.labels("admission").inc()
+            raise
         
-        session = BrowserSession(session_id, port)
-        
-        if await session.start():
-            session_info = SessionInfo(
-                session_id=session.session_id,
-                port=session.port,
-                cdp_endpoint=session.cdp_endpoint,
-                cdp_websocket_url=session.cdp_websocket_url,
-                cdp_discovery_url=f"http://localhost:{session.port}/json",
-                created_at=session.created_at,
-                uptime_seconds=session.uptime_seconds,
-                status=session.status,
-                video_preview_link=None
-            )
+        session_info = session.to_info()
+        phase_start = time.perf_counter()
+        try:
             await repo.create(session_info)
-            self.sessions[session_id] = session
-            return session_info
+        except Exception:
+            # Write-through failed: don't keep a session nobody can see
+            SESSION_CREATE_FAILURES.labels("repository").inc()
+            del self.sessions[session_id]
+            await self._discard(session)
+            raise
+        session.timings["repo_write"] = time.perf_counter() - phase_start
+        self._record_created(session, mode, time.perf_counter() - started)
+        return session_info
+    
+    def _record_created(self, session: Union[BrowserSession, ContextSession], mode: str, elapsed: float):
+        if isinstance(session, ContextSession):
+            source = "shared"
+        elif "pool_assign" in session.timings:
+            source = "pool"
+        else:
+            source = "cold"
+        SESSIONS_CREATED.labels(mode, source).inc()
+        SESSION_CREATE_SECONDS.labels(mode, source).observe(elapsed)
+        for phase, seconds in session.timings.items():
+            SESSION_CREATE_PHASE_SECONDS.labels(phase).observe(seconds)
+    
+    async def _acquire_browser(
+        self,
+        session_id: str,
+        profile: str,
+        template: Optional[str] = None
+    ) -> Optional[BrowserSession]:
+        """Take a browser from the warm pool, falling back to a cold start.
         
-        return None
+        The pool only holds browsers with the default profile and no template.
+        """
+        pooled = profile == settings.default_profile and not template
+        session = self.warm_pool.acquire() if pooled else None
+        if session:
+            await session.assign(session_id)
+            return session
+        return await self._launch_session(session_id, profile, template)
+    
+    async def _launch_session(
+        self,
+        session_id: str,
+        profile: str,
+        template: Optional[str] = None
+    ) -> Optional[BrowserSession]:
+        """Cold-start a browser when the warm pool has nothing ready."""
+        if not await self._claim_capacity():
+            return None
+        try:
+            port = allocate_port(session_id)
+            if not port:
+                return None
+            session = BrowserSession(session_id, port, profile, template)
+            if await session.start():
+                return session
+            return None
+        finally:
+            self.launching -= 1
+    
+    async def _claim_capacity(self) -> bool:
+        """Count one more browser as launching, evicting an idle pool browser if need be.
+        
+        The pool only serves default-profile sessions without a template, so
+        its browsers give way to launches it cannot serve. The caller must
+        decrement ``launching`` once its browser is counted elsewhere.
+        """
+        no_port = not settings.gateway_mode and port_allocator.get_available_count(recheck=True) == 0
+        if self.has_capacity() and not no_port:
+            self.launching += 1
+            return True
+        if not self.warm_pool.idle:
+            return False
+        # Take over the pool browser's slot before freeing it, so a refill cannot claim it
+        browser = self.warm_pool.idle.popleft()
+        self.launching += 1
+        print(f"Evicting idle pool browser {browser.session_id} to make room")
+        await browser.cleanup()
+        return True
+    
+    async def _acquire_context(self, session_id: str, profile: str) -> Optional[ContextSession]:
+        """Open a browser context in the fullest shared container that has room.
+        
+        Shared containers are only filled with sessions asking for their profile.
+        """
+        candidates = [
+            shared for shared in self.shared_browsers
+            if shared.profile == profile and shared.free_slots > 0 and (shared.active or not shared.ready.is_set())
+        ]
+        if candidates:
+            shared = min(candidates, key=lambda candidate: candidate.free_slots)
+        else:
+            shared = await self._launch_shared_browser(profile)
+            if not shared:
+                return None
+        
+        shared.reserved += 1
+        try:
+            await shared.ready.wait()
+            if not shared.active:
+                return None
+            return await shared.open_context(session_id)
+        except Exception as e:
+            print(f"Failed to open browser context for session {session_id}: {e}")
+            return None
+        finally:
+            shared.reserved -= 1
+            await self._close_shared_if_empty(shared)
+    
+    async def _launch_shared_browser(self, profile: str) -> Optional[SharedBrowser]:
+        if not await self._claim_capacity():
+            return None
+        try:
+            shared_id = f"shared-{uuid.uuid4()}"
+            port = allocate_port(shared_id)
+            if not port:
+                return None
+            shared = SharedBrowser(shared_id, port, profile)
+            self.shared_browsers.append(shared)
+            shared.start_task = asyncio.create_task(shared.start())
+            return shared
+        finally:
+            self.launching -= 1
+    
+    async def _close_shared_if_empty(self, shared: SharedBrowser):
+        """Remove a shared container once its last context is gone."""
+        if shared.contexts or shared.reserved or not shared.ready.is_set():
+            return
+        if shared in self.shared_browsers:
+            self.shared_browsers.remove(shared)
+            await shared.close()
+            self.warm_pool.notify()
     
     async def release_session(self, repo: SessionRepository, session_id: str) -> bool:
         if session_id not in self.sessions:
             return False
         
-        session = self.sessions[session_id]
-        await session.cleanup()
+        started = time.perf_counter()
+        session = self.sessions.pop(session_id)
+        if not await self._recycle(session):
+            await self._discard(session)
         await repo.delete(session_id)
-        del self.sessions[session_id]
+        SESSIONS_CLOSED.labels("released").inc()
+        SESSION_RELEASE_SECONDS.observe(time.perf_counter() - started)
+        return True
+    
+    async def _recycle(self, session: Union[BrowserSession, ContextSession]) -> bool:
+        """Restart a released browser on a fresh profile and return it to the warm pool.
+        
+        Only browsers the pool could hand out again qualify, each up to
+        BROWSER_MAX_RECYCLES times and only in gateway mode. Returns False
+        when the browser should be torn down instead, including when the
+        restart fails.
+        """
+        if (
+            # Outside the gateway the previous client could still reach the browser's port
+            not settings.gateway_mode
+            or isinstance(session, ContextSession)
+            or session.recycles >= settings.browser_max_recycles
+            or session.profile != settings.default_profile
+            or session.template
+            or session.status != "active"
+            # Its gateway connections are still being counted against it
+            or session.gateway_clients
+            or len(self.warm_pool.idle) >= self.warm_pool.max_idle
+        ):
+            return False
+        
+        # Counted as a pool browser while it restarts
+        self.warm_pool.starting += 1
+        try:
+            await session.return_to_pool(f"pool-{uuid.uuid4()}")
+        except Exception as e:
+            print(f"Could not restart browser of session {session.session_id}; tearing it down: {e}")
+            BROWSERS_RECYCLED.labels("failed").inc()
+            return False
+        finally:
+            self.warm_pool.starting -= 1
+        self.warm_pool.idle.append(session)
+        BROWSERS_RECYCLED.labels("recycled").inc()
+        self.admission.notify()
+        self.cluster.notify()
         return True
     
+    async def _discard(self, session: Union[BrowserSession, ContextSession]):
+        """Tear down a session that is no longer tracked in ``sessions``."""
+        started = time.perf_counter()
+        await session.cleanup()
+        kind = "context" if isinstance(session, ContextSession) else "container"
+        SESSION_CLEANUP_SECONDS.labels(kind).observe(time.perf_counter() - started)
+        if isinstance(session, ContextSession):
+            await self._close_shared_if_empty(session.shared)
+        self.warm_pool.notify()
+        self.admission.notify()
+        self.cluster.notify()
+    
     async def get_session(self, repo: SessionRepository, session_id: str) -> Optional[SessionInfo]:
+        session = self.sessions.get(session_id)
+        if session:
+            return session.to_info()
         return await repo.get(session_id)
     
-    async def list_sessions(self, repo: SessionRepository) -> List[SessionInfo]:
-        return await repo.list_all()
+    async def list_sessions(self, repo: SessionRepository, query: Optional[SessionQuery] = None) -> SessionListResponse:
+        """Page through sessions with the same cursors as the repositories.
+        
+        In cluster mode other nodes' sessions only exist in the repository,
+        so listing reads it instead of this process's sessions.
+        """
+        query = query or SessionQuery()
+        if self.cluster.enabled:
+            page, next_cursor = await repo.list_page(query)
+            return SessionListResponse(sessions=page, total_count=await repo.count(query), next_cursor=next_cursor)
+        matching = sorted(
+            (info for info in (session.to_info() for session in self.sessions.values()) if query.matches(info)),
+            key=lambda info: (info.created_at, info.session_id)
+        )
+        total_count = len(matching)
+        if query.cursor:
+            after = decode_cursor(query.cursor)
+            matching = [info for info in matching if (info.created_at, info.session_id) > after]
+        page = matching[:query.limit]
+        next_cursor = encode_cursor(page[-1]) if len(matching) > query.limit else None
+        return SessionListResponse(sessions=page, total_count=total_count, next_cursor=next_cursor)
+    
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(settings.session_sync_interval)
+            # Ports that were busy on the host may have been freed since
+            port_allocator.recheck_blocked()
+            try:
+                await self.sync_containers()
+            except Exception as e:
+                print(f"Session sync failed: {e}")
+    
+    async def sync_containers(self):
+        """Evict sessions whose containers or processes died outside the API."""
+        # Snapshot first so sessions started during the Docker call are not evicted
+        sessions = list(self.sessions.values())
+        shared_browsers = [shared for shared in self.shared_browsers if shared.ready.is_set()]
+        idle = list(self.warm_pool.idle)
+        
+        running = await browser_backend.running()
+        
+        for browser in idle:
+            if browser.container_id not in running and browser in self.warm_pool.idle:
+                self.warm_pool.idle.remove(browser)
+                await self._discard(browser)
+        
+        dead = [
+            session for session in sessions
+            if session.container_id not in running
+            and session.status != "restarting"
+            and self.sessions.get(session.session_id) is session
+        ]
+        dead_shared = [shared for shared in shared_browsers if shared.browser.container_id not in running]
+        if not dead and not dead_shared:
+            return
+        
+        await self._evict(dead, "container_gone")
+        for shared in dead_shared:
+            if shared in self.shared_browsers:
+                self.shared_browsers.remove(shared)
+                await shared.close()
+    
+    async def _evict(self, sessions: List[Union[BrowserSession, ContextSession]], reason: str):
+        """Drop sessions whose browser is gone, along with their repository rows."""
+        # Skip sessions released in the meantime
+        sessions = [session for session in sessions if self.sessions.get(session.session_id) is session]
+        for session in sessions:
+            print(f"Browser for session {session.session_id} is gone ({reason}); evicting")
+            del self.sessions[session.session_id]
+        async with repository_scope() as repo:
+            await self._teardown(repo, sessions, reason)
+    
+    async def _teardown(
+        self,
+        repo: SessionRepository,
+        sessions: List[Union[BrowserSession, ContextSession]],
+        reason: str,
+        progress: Optional[Callable[[bool], None]] = None
+    ):
+        """Tear down sessions already removed from ``sessions``, then drop their rows.
+        
+        Browsers are stopped TEARDOWN_CONCURRENCY at a time and the rows go
+        in a single bulk delete. ``progress`` is called with whether each
+        teardown succeeded.
+        """
+        semaphore = asyncio.Semaphore(settings.teardown_concurrency)
+        
+        async def discard(session: Union[BrowserSession, ContextSession]):
+            async with semaphore:
+                try:
+                    await self._discard(session)
+                    ok = True
+                except Exception as e:
+                    print(f"Error tearing down session {session.session_id}: {e}")
+                    ok = False
+            SESSIONS_CLOSED.labels(reason).inc()
+            if progress:
+                progress(ok)
+        
+        await asyncio.gather(*(discard(session) for session in sessions))
+        await repo.delete_many([session.session_id for session in sessions])
+    
+    async def _events_loop(self):
+        """Follow the backend's event stream, reconnecting when it drops.
+        
+        The sync loop still runs as a backstop for events missed while
+        reconnecting.
+        """
+        while True:
+            try:
+                async for event in browser_backend.watch():
+                    task = asyncio.create_task(self.handle_browser_event(event))
+                    self._event_tasks.add(task)
+                    task.add_done_callback(self._event_tasks.discard)
+                return  # the backend has no event stream
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Browser event stream failed: {e}; reconnecting")
+            await asyncio.sleep(5)
+    
+    async def handle_browser_event(self, event: BrowserEvent):
+        """Evict, refresh or replace whatever ran in a browser that died or restarted."""
+        idle = next((browser for browser in self.warm_pool.idle if browser.container_id == event.handle), None)
+        shared = next((shared for shared in self.shared_browsers if shared.browser.container_id == event.handle), None)
+        session = next((
+            session for session in self.sessions.values()
+            if isinstance(session, BrowserSession) and session.container_id == event.handle
+        ), None)
+        if not (idle or shared or session):
+            return  # stopped by the API itself, or not ours
+        
+        reason = "restarted" if event.action == "restarted" else "oom" if event.oom else "crashed"
+        BROWSER_EXITS.labels(reason).inc()
+        print(f"Browser {event.handle} {event.action}"
+              + (f" with code {event.exit_code}" if event.exit_code is not None else "")
+              + (" after running out of memory" if event.oom else ""))
+        try:
+            if idle:
+                if idle in self.warm_pool.idle:
+                    self.warm_pool.idle.remove(idle)
+                    await self._discard(idle)
+            elif shared:
+                # Browser contexts do not survive a restart either
+                contexts = [
+                    session for session in self.sessions.values()
+                    if isinstance(session, ContextSession) and session.shared is shared
+                ]
+                await self._evict(contexts, reason)
+                if shared in self.shared_browsers:
+                    self.shared_browsers.remove(shared)
+                    await shared.close()
+            elif settings.session_auto_replace and await self._replace(session, event):
+                SESSIONS_REPLACED.inc()
+            else:
+                await self._evict([session], reason)
+        except Exception as e:
+            print(f"Failed to handle {event.action} of browser {event.handle}: {e}")
+    
+    async def _replace(self, session: BrowserSession, event: BrowserEvent) -> bool:
+        """Give a session a new browser in place of the one that died.
+        
+        The session keeps its ID, port and profile; clients reconnect to the
+        new browser's WebSocket URL (unchanged in gateway mode).
+        """
+        print(f"Replacing browser for session {session.session_id}")
+        session.status = "restarting"
+        if event.action == "restarted":
+            # Chromium came back on its own, under a new browser ID
+            try:
+                version = await wait_for_cdp(session.cdp_port, host=session.cdp_host, timeout=settings.cdp_timeout)
+            except asyncio.TimeoutError:
+                return False
+            await session.get_cdp_websocket_url(version)
+            session.status = "active"
+        else:
+            await browser_backend.remove(event.handle)
+            session.container_id = None
+            session.timings = {}
+            # start() releases the port itself if the new browser fails
+            if not await session.start():
+                return False
+        if self.sessions.get(session.session_id) is not session:
+            await session.cleanup()  # released while the new browser was starting
+            return True
+        session.touch()
+        session.activity_signature = None
+        async with repository_scope() as repo:
+            await repo.update_fields(session.session_id, {
+                "cdp_endpoint": session.cdp_endpoint,
+                "cdp_websocket_url": session.cdp_websocket_url,
+                "status": session.status
+            })
+        return True
+    
+    async def _reaper_loop(self):
+        while True:
+            await asyncio.sleep(settings.reaper_interval)
+            try:
+                await self.reap_expired()
+            except Exception as e:
+                print(f"Session reaper failed: {e}")
+    
+    async def reap_expired(self):
+        """Reclaim sessions past their idle timeout or maximum lifetime."""
+        sessions = [session for session in self.sessions.values() if session.status == "active"]
+        if settings.session_idle_timeout > 0:
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2)) as http:
+                await asyncio.gather(*(self._check_activity(http, session) for session in sessions))
+        
+        now = time.monotonic()
+        expired = []
+        for session in sessions:
+            if self.sessions.get(session.session_id) is not session:
+                continue  # released while we were probing
+            if settings.session_max_lifetime > 0 and session.uptime_seconds >= settings.session_max_lifetime:
+                expired.append((session, "lifetime"))
+            elif settings.session_idle_timeout > 0 and now - session.last_activity >= settings.session_idle_timeout:
+                expired.append((session, "idle"))
+        if not expired:
+            return
+        
+        for session, reason in expired:
+            print(f"Session {session.session_id} expired ({reason}); reclaiming")
+            del self.sessions[session.session_id]
+        async with repository_scope() as repo:
+            for reason in ("lifetime", "idle"):
+                await self._teardown(repo, [session for session, why in expired if why == reason], reason)
+    
+    async def _check_activity(self, http: aiohttp.ClientSession, session: Union[BrowserSession, ContextSession]):
+        """Refresh ``last_activity`` from the browser's CDP target list.
+        
+        A session counts as active while a gateway client is connected, while
+        any of its targets has a DevTools client attached (Chromium then omits
+        webSocketDebuggerUrl), or when its set of open targets and URLs changed.
+        """
+        if session.gateway_clients:
+            session.touch()
+            return
+        try:
+            async with http.get(f"http://{session.cdp_host}:{session.cdp_port}/json/list") as response:
+                targets = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return
+        if isinstance(session, ContextSession):
+            targets = [target for target in targets if target.get("id") == session.target_id]
+        signature = tuple(sorted((target.get("id"), target.get("url")) for target in targets))
+        attached = any("webSocketDebuggerUrl" not in target for target in targets)
+        if attached or (session.activity_signature is not None and signature != session.activity_signature):
+            session.touch()
+        session.activity_signature = signature
+    
+    async def capture_template(
+        self,
+        session_id: str,
+        name: str,
+        include_cookies: bool = False,
+        overwrite: bool = False
+    ) -> Optional[TemplateInfo]:
+        """Save a running session's user data dir as profile template ``name``.
+        
+        Returns None if this process has no such session. Raises
+        ``ValueError`` for context sessions, whose browser is shared, and
+        whatever ``ProfileTemplateStore.capture`` raises.
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+        if isinstance(session, ContextSession):
+            raise ValueError("Context sessions share a browser profile and cannot be captured")
+        
+        async def fill(directory: str, exclude: List[str]):
+            await browser_backend.capture_profile(session, directory, exclude)
+        
+        return await profile_templates.capture(name, session_id, fill, include_cookies, overwrite)
     
     def get_uptime_seconds(self) -> int:
         return int((datetime.now() - self.start_time).total_seconds())
     
-    async def cleanup_all(self, repo: SessionRepository):
-        for session in list(self.sessions.values()):
-            await session.cleanup()
+    async def cleanup_all(self, repo: SessionRepository, job: Optional[Job] = None):
+        """Tear down every session on this node and delete their rows.
+        
+        With ``job``, its totals are kept up to date as browsers are stopped.
+        """
+        sessions = list(self.sessions.values())
         self.sessions.clear()
-        # Optional: clear DB
-        # But better to let user manage via /cleanup
+        if job:
+            job.total = len(sessions)
+        await self._teardown(repo, sessions, "cleanup", job.advance if job else None)
+        for shared in list(self.shared_browsers):
+            await self._close_shared_if_empty(shared)
+        self.warm_pool.notify()
     
-    async def create_multiple_browsers(self, repo: SessionRepository, count: int = 5) -> Dict:
-        try:
-            browsers = []
-            ports = list(range(settings.port_start, settings.port_start + count))
-            
-            for i, port in enumerate(ports):
+    async def create_multiple_browsers(self, count: int = 5, profile: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Launch ``count`` browsers concurrently, yielding each result as it is ready.
+        
+        Sessions still open once every launch has finished are written to the
+        repository in one bulk insert, followed by a final summary item. The
+        launches and the insert run in a task of their own, so they finish
+        even if the caller stops reading, e.g. when the client disconnects.
+        """
+        profile = profile or settings.default_profile
+        semaphore = asyncio.Semaphore(settings.batch_create_concurrency)
+        created: List[BrowserSession] = []
+        results: asyncio.Queue = asyncio.Queue()
+        
+        async def launch(browser_number: int) -> Dict:
+            async with semaphore:
+                session_id = str(uuid.uuid4())
+                started = time.perf_counter()
                 try:
-                    if not port_allocator.is_port_available(port):
-                        browsers.append({
-                            "browser_number": i + 1,
-                            "host_port": port,
-                            "error": "Port not available",
-                            "status": "failed"
-                        })
-                        continue
-                    
-                    session_id = f"browser-{port}"
-                    session = BrowserSession(session_id, port)
-                    
-                    if await session.start():
-                        self.sessions[session_id] = session
-                        session_info = SessionInfo(
-                            session_id=session_id,
-                            port=port,
-                            cdp_endpoint=session.cdp_endpoint,
-                            cdp_websocket_url=session.cdp_websocket_url,
-                            cdp_discovery_url=f"http://localhost:{port}/json",
-                            created_at=session.created_at,
-                            uptime_seconds=session.uptime_seconds,
-                            status=session.status,
-                            video_preview_link=None
-                        )
-                        await repo.create(session_info)
-                        browsers.append({
-                            "browser_number": i + 1,
-                            "session_id": session_id,
-                            "container_id": session.container_id,
-                            "host_port": port,
-                            "browser_id": session.browser_id,
-                            "ws_url": session.cdp_websocket_url,
-                            "status": "created"
-                        })
-                    else:
-                        browsers.append({
-                            "browser_number": i + 1,
-                            "host_port": port,
-                            "error": "Failed to start browser",
-                            "status": "failed"
-                        })
-                        
+                    # A queue timeout (AdmissionRejected) is reported like any other failure
+                    async with self.admission.admit("container", profile):
+                        session = await self._acquire_browser(session_id, profile)
+                        if session:
+                            self.sessions[session_id] = session
                 except Exception as e:
-                    browsers.append({
-                        "browser_number": i + 1,
-                        "host_port": port,
-                        "error": str(e),
+                    SESSION_CREATE_FAILURES.labels("admission" if isinstance(e, AdmissionRejected) else "launch").inc()
+                    return {"browser_number": browser_number, "error": str(e), "status": "failed"}
+                if not session:
+                    SESSION_CREATE_FAILURES.labels("launch").inc()
+                    return {
+                        "browser_number": browser_number,
+                        "error": "Failed to start browser. Maximum sessions reached or no ports available.",
                         "status": "failed"
-                    })
-            
-            return {
-                "message": f"Created {len([b for b in browsers if b['status'] == 'created'])} browsers",
-                "browsers": browsers,
-                "total_ports": ports
-            }
+                    }
+                created.append(session)
+                self._record_created(session, "container", time.perf_counter() - started)
+                return {
+                    "browser_number": browser_number,
+                    "session_id": session_id,
+                    "container_id": session.container_id,
+                    "host_port": session.port,
+                    "browser_id": session.browser_id,
+                    "ws_url": session.cdp_websocket_url,
+                    "status": "created"
+                }
+        
+        async def run_batch():
+            async def report(browser_number: int):
+                results.put_nowait(await launch(browser_number))
             
-        except Exception as e:
-            return {"error": str(e)}
+            try:
+                await asyncio.gather(*(report(i + 1) for i in range(count)))
+                # Sessions released or evicted mid-batch must not get a row
+                live = [session.to_info() for session in created if self.sessions.get(session.session_id) is session]
+                if live:
+                    async with repository_scope() as repo:
+                        await repo.create_many(live)
+            finally:
+                # The reader waits for this item, so it is sent even if the insert fails
+                results.put_nowait({
+                    "message": f"Created {len(created)} browsers",
+                    "created": len(created),
+                    "failed": count - len(created)
+                })
+        
+        batch = asyncio.create_task(run_batch())
+        self._batches.add(batch)
+        batch.add_done_callback(self._batches.discard)
+        for _ in range(count + 1):
+            yield await results.get()
+        await batch
 
 
 # Global browser manager instance
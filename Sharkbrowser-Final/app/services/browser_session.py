@@ -0,0 +1,179 @@
+# app/services/browser_session.py
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from app.config import settings
+from app.models.session_model import SessionInfo
+from app.services.backends import browser_backend
+from app.utils.cdp_helper import get_browser_id
+from app.utils.host_resolver import host_resolver
+from app.utils.port_helper import port_allocator
+
+
+def allocate_port(session_id: str) -> Optional[int]:
+    """Reserve the port a session's clients connect to.
+    
+    In gateway mode every session is served through the API port, so no host
+    port is leased from the browser range.
+    """
+    if settings.gateway_mode:
+        return settings.port
+    return port_allocator.get_available_port(session_id)
+
+
+class BrowserSession:
+    """Represents a single browser session."""
+    
+    websocket_kind = "browser"
+    
+    def __init__(self, session_id: str, port: int, profile: Optional[str] = None, template: Optional[str] = None):
+        self.session_id = session_id
+        self.port = port
+        self.profile = profile or settings.default_profile
+        self.template = template  # profile template the user data dir starts from
+        self.template_layer: Optional[str] = None  # backend's writable layer over the template
+        self.created_at = datetime.now()
+        self.status = "starting"
+        self.container_id: Optional[str] = None  # backend handle: container ID or process
+        self.browser_id: Optional[str] = None
+        self.public_host: Optional[str] = None
+        # Where the API itself reaches the browser's CDP server
+        self.cdp_host = "localhost"
+        self.cdp_port = port
+        self.timings: Dict[str, float] = {}
+        # Activity tracking for the idle reaper
+        self.last_activity = time.monotonic()
+        self.activity_signature: Optional[tuple] = None
+        self.gateway_clients = 0
+        self.recycles = 0  # times reset and handed to another session
+    
+    def touch(self):
+        self.last_activity = time.monotonic()
+    
+    @property
+    def cdp_websocket_url(self) -> Optional[str]:
+        if not self.browser_id:
+            return None
+        if settings.gateway_mode:
+            return f"ws://{self.public_host}:{settings.port}/devtools/browser/{self.session_id}"
+        return f"ws://{self.public_host}:{self.port}/devtools/browser/{self.browser_id}"
+    
+    @property
+    def cdp_discovery_url(self) -> Optional[str]:
+        if settings.gateway_mode:
+            return None
+        return f"http://localhost:{self.port}/json"
+    
+    @property
+    def preview_url(self) -> Optional[str]:
+        if not settings.preview_enabled or not self.public_host:
+            return None
+        return f"http://{self.public_host}:{settings.port}/v1/sessions/{self.session_id}/preview"
+    
+    @property
+    def upstream_websocket_url(self) -> str:
+        """Browser WebSocket URL as reachable from the API process."""
+        return f"ws://{self.cdp_host}:{self.cdp_port}/devtools/browser/{self.browser_id}"
+    
+    @property
+    def cdp_endpoint(self) -> str:
+        if self.cdp_websocket_url:
+            return self.cdp_websocket_url
+        return f"ws://localhost:{self.port}"
+    
+    @property
+    def uptime_seconds(self) -> int:
+        return int((datetime.now() - self.created_at).total_seconds())
+    
+    def to_info(self) -> SessionInfo:
+        return SessionInfo(
+            session_id=self.session_id,
+            port=self.port,
+            cdp_endpoint=self.cdp_endpoint,
+            cdp_websocket_url=self.cdp_websocket_url,
+            cdp_discovery_url=self.cdp_discovery_url,
+            created_at=self.created_at,
+            uptime_seconds=self.uptime_seconds,
+            status=self.status,
+            video_preview_link=self.preview_url,
+            node_id=settings.cluster_node_id if settings.cluster_enabled else None
+        )
+    
+    async def get_cdp_websocket_url(self, version: Dict) -> str:
+        """Build the public browser WebSocket URL from a /json/version payload."""
+        self.browser_id = get_browser_id(version["webSocketDebuggerUrl"])
+        self.public_host = await host_resolver.get()
+        return self.cdp_websocket_url
+    
+    async def start(self) -> bool:
+        try:
+            try:
+                version = await browser_backend.launch(self)
+            except asyncio.TimeoutError:
+                print(f"Browser for session {self.session_id} not ready after {settings.cdp_timeout}s")
+                self.status = "error"
+                await self.cleanup()
+                return False
+            
+            phase_start = time.perf_counter()
+            await self.get_cdp_websocket_url(version)
+            self.timings["url_resolve"] = time.perf_counter() - phase_start
+            
+            self.status = "active"
+            print(f"Browser session {self.session_id} ready: "
+                  + ", ".join(f"{phase}={elapsed:.3f}s" for phase, elapsed in self.timings.items()))
+            return True
+        
+        except Exception as e:
+            print(f"Failed to start browser session {self.session_id}: {e}")
+            self.status = "error"
+            await self.cleanup()
+            return False
+    
+    async def assign(self, session_id: str):
+        """Hand a pre-started browser over to a client session."""
+        phase_start = time.perf_counter()
+        self.session_id = session_id
+        self.created_at = datetime.now()
+        self.touch()
+        self.activity_signature = None
+        port_allocator.transfer(self.port, session_id)
+        await browser_backend.rename(self, f"browser-{session_id}")
+        # Start-up phases belong to the pool, not to this session
+        self.timings = {"pool_assign": time.perf_counter() - phase_start}
+    
+    async def return_to_pool(self, pool_id: str):
+        """Restart the browser on a fresh profile and hand it to the warm pool under ``pool_id``.
+        
+        Nothing the previous session left behind survives a restart: storage
+        of every origin it visited, service and shared workers, and targets
+        of any kind. Raises if the new browser does not come up.
+        """
+        # The lease and the session ID move together, so cleanup still frees the port if the restart fails
+        port_allocator.transfer(self.port, pool_id)
+        self.session_id = pool_id
+        self.gateway_clients = 0
+        self.recycles += 1
+        handle = self.container_id
+        await browser_backend.stop(self)
+        if handle:
+            # Wait until the old browser is gone, so its name can be reused
+            await browser_backend.remove(handle)
+        self.container_id = None
+        self.browser_id = None
+        self.timings = {}
+        self.status = "starting"
+        if not await self.start():
+            raise RuntimeError(f"Browser for {pool_id} did not come back up")
+    
+    async def cleanup(self):
+        try:
+            await browser_backend.stop(self)
+        except Exception as e:
+            print(f"Error during cleanup for session {self.session_id}: {e}")
+        finally:
+            # A second cleanup, e.g. eviction after a failed replacement, leaves the port alone
+            if self.status != "closed":
+                port_allocator.release_port(self.port, self.session_id)
+            self.status = "closed"
@@ -0,0 +1,162 @@
+# app/services/cluster.py
+import asyncio
+import aiohttp
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from app.config import settings
+from app.db import node_repository_scope
+from app.models.node_model import NodeInfo
+
+FORWARDED_HEADER = "X-SharkBrowser-Forwarded-By"
+
+
+class ClusterNode:
+    """This API's membership in a multi-node deployment.
+    
+    Each node heartbeats its capacity and session count into the shared
+    repository. A create request reserves a slot on the least-loaded live
+    node with an atomic conditional update, then either runs locally or is
+    forwarded to that node; requests for a session owned by another node are
+    forwarded to it.
+    """
+    
+    def __init__(self, active_sessions: Callable[[], int]):
+        self._active_sessions = active_sessions
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._http: Optional[aiohttp.ClientSession] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return settings.cluster_enabled
+    
+    @property
+    def node_id(self) -> str:
+        return settings.cluster_node_id
+    
+    @property
+    def capacity(self) -> int:
+        if settings.session_mode == "context":
+            return settings.max_browsers * settings.contexts_per_container
+        return settings.max_browsers
+    
+    def is_forwarded(self, headers: Mapping[str, str]) -> bool:
+        """True for requests another node already placed on this one."""
+        return FORWARDED_HEADER in headers
+    
+    def start(self):
+        if not self.enabled or self._task:
+            return
+        self._task = asyncio.create_task(self._heartbeat_loop())
+        print(f"🛰️ Cluster node {self.node_id} at {settings.cluster_node_url}")
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            try:
+                async with node_repository_scope() as nodes:
+                    await nodes.delete(self.node_id)
+            except Exception as e:
+                print(f"Failed to deregister node {self.node_id}: {e}")
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+    
+    def notify(self):
+        """Publish this node's load soon, e.g. after sessions were released."""
+        self._wakeup.set()
+    
+    async def report_load(self):
+        """Publish this node's load now, e.g. before releasing a reservation."""
+        try:
+            await self._publish_load()
+        except Exception as e:
+            print(f"Failed to publish load for node {self.node_id}: {e}")
+    
+    async def _publish_load(self):
+        async with node_repository_scope() as nodes:
+            await nodes.heartbeat(NodeInfo(
+                node_id=self.node_id,
+                url=settings.cluster_node_url,
+                capacity=self.capacity,
+                active=self._active_sessions(),
+                heartbeat_at=datetime.now()
+            ))
+    
+    async def _heartbeat_loop(self):
+        while True:
+            try:
+                await self._publish_load()
+                async with node_repository_scope() as nodes:
+                    await nodes.expire_reservations(
+                        self.node_id,
+                        datetime.now() - timedelta(seconds=settings.node_reservation_ttl)
+                    )
+            except Exception as e:
+                print(f"Node heartbeat failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.node_heartbeat_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+    
+    async def live_nodes(self) -> List[NodeInfo]:
+        since = datetime.now() - timedelta(seconds=settings.node_ttl)
+        async with node_repository_scope() as nodes:
+            return await nodes.list_live(since)
+    
+    async def place(self) -> Optional[NodeInfo]:
+        """Reserve a session slot on the least-loaded live node.
+        
+        Ties go to this node to save a hop. Returns None when every node is
+        full; the caller then creates locally and waits for admission there.
+        """
+        live = sorted(await self.live_nodes(), key=lambda node: (node.load, node.node_id != self.node_id))
+        async with node_repository_scope() as nodes:
+            for node in live:
+                if await nodes.try_reserve(node.node_id):
+                    return node
+        return None
+    
+    async def release_reservation(self, node_id: str):
+        try:
+            async with node_repository_scope() as nodes:
+                await nodes.release_reservation(node_id)
+        except Exception as e:
+            # The owning node expires it after NODE_RESERVATION_TTL
+            print(f"Failed to release reservation on node {node_id}: {e}")
+    
+    async def get_node(self, node_id: str) -> Optional[NodeInfo]:
+        """Look up a node, or None if it is unknown or stopped heartbeating."""
+        async with node_repository_scope() as nodes:
+            node = await nodes.get(node_id)
+        if node and node.heartbeat_at >= datetime.now() - timedelta(seconds=settings.node_ttl):
+            return node
+        return None
+    
+    async def forward(
+        self,
+        node: NodeInfo,
+        method: str,
+        path: str,
+        payload: Optional[Any] = None
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        """Replay a request on another node; returns its status, JSON body and Retry-After."""
+        if self._http is None:
+            # Forwarded creates may queue for admission on the target
+            timeout = aiohttp.ClientTimeout(
+                total=settings.admission_timeout + settings.cdp_timeout + 30,
+                connect=5
+            )
+            self._http = aiohttp.ClientSession(timeout=timeout)
+        async with self._http.request(
+            method,
+            f"{node.url}{path}",
+            json=payload,
+            headers={FORWARDED_HEADER: self.node_id}
+        ) as response:
+            body = await response.json(content_type=None)
+            headers = {"Retry-After": response.headers["Retry-After"]} if "Retry-After" in response.headers else {}
+            return response.status, body, headers
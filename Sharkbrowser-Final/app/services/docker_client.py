@@ -0,0 +1,62 @@
+# app/services/docker_client.py
+import asyncio
+import time
+import docker
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+from app.config import settings
+from app.utils.metrics import DOCKER_CALL_ERRORS, DOCKER_CALL_SECONDS
+
+
+class DockerClient:
+    """Shared Docker client whose blocking calls run on a bounded thread pool."""
+
+    def __init__(self):
+        self._client: Optional[docker.DockerClient] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.docker_max_workers,
+                thread_name_prefix="docker"
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking Docker SDK call without stalling the event loop."""
+        loop = asyncio.get_running_loop()
+        operation = getattr(fn, "__name__", "call")
+        started = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+        except Exception:
+            DOCKER_CALL_ERRORS.labels(operation).inc()
+            raise
+        finally:
+            DOCKER_CALL_SECONDS.labels(operation).observe(time.perf_counter() - started)
+
+    async def get_client(self) -> docker.DockerClient:
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    self._client = await self.run(
+                        docker.from_env,
+                        max_pool_size=settings.docker_max_workers
+                    )
+        return self._client
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global Docker client instance
+docker_client = DockerClient()
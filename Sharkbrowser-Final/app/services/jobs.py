@@ -0,0 +1,85 @@
+# app/services/jobs.py
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+from app.models.job_model import JobInfo
+
+# Finished jobs kept around for polling
+MAX_FINISHED_JOBS = 100
+
+
+class Job:
+    """A long-running operation clients poll instead of waiting on."""
+    
+    def __init__(self, kind: str):
+        self.job_id = str(uuid.uuid4())
+        self.kind = kind
+        self.status = "running"
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+    
+    def advance(self, ok: bool = True):
+        """Count one item as done."""
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+    
+    def to_info(self) -> JobInfo:
+        return JobInfo(
+            job_id=self.job_id,
+            kind=self.kind,
+            status=self.status,
+            total=self.total,
+            completed=self.completed,
+            failed=self.failed,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+            error=self.error
+        )
+
+
+class JobRegistry:
+    """Runs jobs as background tasks and remembers the most recent ones."""
+    
+    def __init__(self):
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+    
+    def start(self, kind: str, run: Callable[[Job], Awaitable[None]]) -> Job:
+        job = Job(kind)
+        self.jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job, run))
+        finished = [job_id for job_id, other in self.jobs.items() if other.status != "running"]
+        for job_id in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self.jobs[job_id]
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+    
+    async def wait(self):
+        """Let running jobs finish, e.g. before shutting down."""
+        running = [job.task for job in self.jobs.values() if job.status == "running"]
+        await asyncio.gather(*running, return_exceptions=True)
+    
+    async def _run(self, job: Job, run: Callable[[Job], Awaitable[None]]):
+        try:
+            await run(job)
+            job.status = "completed"
+        except Exception as e:
+            print(f"{job.kind} job {job.job_id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now()
+
+
+# Global job registry
+jobs = JobRegistry()
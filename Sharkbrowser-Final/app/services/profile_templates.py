@@ -0,0 +1,204 @@
+# app/services/profile_templates.py
+import asyncio
+import json
+import os
+import re
+import shutil
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable, List, Set, Tuple
+from app.config import settings
+from app.models.template_model import TEMPLATE_NAME_PATTERN, TemplateInfo
+
+# Never captured: locks and state tied to the browser the profile came from
+CAPTURE_EXCLUDE = ["Singleton*", "DevToolsActivePort", "lockfile", "Crashpad", "BrowserMetrics*"]
+# Cookie stores, captured only on request
+COOKIE_FILES = ["Cookies", "Cookies-journal"]
+
+
+class TemplateInUse(Exception):
+    """Raised when replacing or deleting a template that sessions are running on."""
+
+
+def _tree_size(path: str) -> int:
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(directory, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class ProfileTemplateStore:
+    """Named Chromium user data dirs under PROFILE_TEMPLATE_DIR.
+    
+    Templates are never written to once in place. Docker sessions mount one
+    as the read-only lower layer of an overlay, with a per-session upper
+    layer under ``.sessions``, so starting from a template takes the same
+    time whatever its size. Captures are staged next to the templates and
+    renamed into place. Templates that sessions on this node are mounted on
+    cannot be replaced or deleted.
+    """
+    
+    def __init__(self):
+        self.in_use: Counter = Counter()
+    
+    @property
+    def root(self) -> str:
+        return settings.profile_template_dir
+    
+    @property
+    def host_root(self) -> str:
+        return settings.profile_template_host_dir or settings.profile_template_dir
+    
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+    
+    def _meta_path(self, name: str) -> str:
+        return os.path.join(self.root, ".meta", f"{name}.json")
+    
+    def _layer_path(self, layer: str, root: str) -> str:
+        return os.path.join(root, ".sessions", layer)
+    
+    def get(self, name: str) -> TemplateInfo:
+        """Look up a template; raises ``ValueError`` if there is none by that name."""
+        if not re.match(TEMPLATE_NAME_PATTERN, name) or not os.path.isdir(self.path(name)):
+            raise ValueError(f"Unknown profile template '{name}'")
+        try:
+            with open(self._meta_path(name)) as f:
+                return TemplateInfo(**json.load(f))
+        except (OSError, ValueError):
+            # Put in place by hand rather than captured
+            modified = datetime.fromtimestamp(os.stat(self.path(name)).st_mtime)
+            return TemplateInfo(name=name, size_bytes=0, created_at=modified)
+    
+    def list(self) -> List[TemplateInfo]:
+        if not os.path.isdir(self.root):
+            return []
+        return [
+            self.get(name) for name in sorted(os.listdir(self.root))
+            if re.match(TEMPLATE_NAME_PATTERN, name) and os.path.isdir(self.path(name))
+        ]
+    
+    def mount_layers(self, session) -> Tuple[str, str, str]:
+        """Create a session's writable overlay layers on top of its template.
+        
+        Sets ``session.template_layer`` and returns the lower, upper and work
+        directories as the Docker host sees them.
+        """
+        template = self.path(session.template)
+        layer = uuid.uuid4().hex
+        upper = os.path.join(self._layer_path(layer, self.root), "upper")
+        os.makedirs(upper)
+        os.makedirs(os.path.join(self._layer_path(layer, self.root), "work"))
+        # The merged root takes the upper dir's owner, which must be the browser user
+        stat = os.stat(template)
+        os.chown(upper, stat.st_uid, stat.st_gid)
+        os.chmod(upper, stat.st_mode & 0o7777)
+        session.template_layer = layer
+        self.in_use[session.template] += 1
+        host_layer = self._layer_path(layer, self.host_root)
+        return (
+            os.path.join(self.host_root, session.template),
+            os.path.join(host_layer, "upper"),
+            os.path.join(host_layer, "work")
+        )
+    
+    def adopt_layers(self, session):
+        """Count a re-adopted session's existing layers as in use."""
+        if session.template and session.template_layer:
+            self.in_use[session.template] += 1
+    
+    def unmount_layers(self, session):
+        """Drop a session's overlay layers once its browser is gone."""
+        if not session.template_layer:
+            return
+        shutil.rmtree(self._layer_path(session.template_layer, self.root), ignore_errors=True)
+        session.template_layer = None
+        self.in_use[session.template] -= 1
+        if self.in_use[session.template] <= 0:
+            del self.in_use[session.template]
+    
+    def prune(self, keep: Set[str]):
+        """Remove layers of browsers that are gone and leftovers of interrupted captures."""
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            if name.startswith((".staging-", ".trash-")):
+                shutil.rmtree(self.path(name), ignore_errors=True)
+        layers = os.path.join(self.root, ".sessions")
+        if os.path.isdir(layers):
+            for layer in os.listdir(layers):
+                if layer not in keep:
+                    shutil.rmtree(os.path.join(layers, layer), ignore_errors=True)
+    
+    async def capture(
+        self,
+        name: str,
+        source_session_id: str,
+        fill: Callable[[str, List[str]], Awaitable[None]],
+        include_cookies: bool = False,
+        overwrite: bool = False
+    ) -> TemplateInfo:
+        """Create or replace template ``name`` with what ``fill(directory, exclude)`` copies in.
+        
+        Raises ``FileExistsError`` when the template exists and ``overwrite``
+        is not set, and ``TemplateInUse`` when sessions are running on it.
+        """
+        exists = os.path.isdir(self.path(name))
+        if exists and not overwrite:
+            raise FileExistsError(f"Profile template '{name}' already exists")
+        self._check_unused(name)
+        
+        os.makedirs(self.root, exist_ok=True)
+        staging = self.path(f".staging-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            await fill(staging, CAPTURE_EXCLUDE + ([] if include_cookies else COOKIE_FILES))
+            size = await asyncio.to_thread(_tree_size, staging)
+            self._check_unused(name)  # a session may have started on it meanwhile
+            old = None
+            if os.path.isdir(self.path(name)):
+                old = self.path(f".trash-{uuid.uuid4().hex}")
+                os.rename(self.path(name), old)
+            os.rename(staging, self.path(name))
+        except BaseException:
+            await asyncio.to_thread(shutil.rmtree, staging, True)
+            raise
+        
+        info = TemplateInfo(
+            name=name,
+            size_bytes=size,
+            created_at=datetime.now(),
+            source_session_id=source_session_id,
+            include_cookies=include_cookies
+        )
+        os.makedirs(os.path.dirname(self._meta_path(name)), exist_ok=True)
+        with open(self._meta_path(name), "w") as f:
+            f.write(info.model_dump_json())
+        if old:
+            await asyncio.to_thread(shutil.rmtree, old, True)
+        return info
+    
+    async def delete(self, name: str):
+        """Delete a template; raises ``ValueError`` if unknown and ``TemplateInUse`` if mounted."""
+        self.get(name)
+        self._check_unused(name)
+        trash = self.path(f".trash-{uuid.uuid4().hex}")
+        os.rename(self.path(name), trash)
+        try:
+            os.remove(self._meta_path(name))
+        except FileNotFoundError:
+            pass
+        await asyncio.to_thread(shutil.rmtree, trash, True)
+    
+    def _check_unused(self, name: str):
+        if self.in_use[name]:
+            raise TemplateInUse(f"Profile template '{name}' is in use by {self.in_use[name]} session(s)")
+
+
+# Global profile template store
+profile_templates = ProfileTemplateStore()
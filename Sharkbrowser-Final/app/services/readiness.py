@@ -0,0 +1,68 @@
+# app/services/readiness.py
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+from app.config import settings
+from app.db import repository_scope
+from app.models.session_model import ReadinessCheck, ReadinessResponse
+from app.services.backends import browser_backend
+
+
+async def _check_repository():
+    async with repository_scope() as repo:
+        await repo.ping()
+
+
+class ReadinessProbe:
+    """Checks the API's dependencies for /ready, at most once per READY_CHECK_INTERVAL.
+    
+    Probes arriving while a check runs wait for it rather than starting
+    their own, so the database and Docker see one check per interval
+    however often /ready is polled.
+    """
+    
+    def __init__(self):
+        self.result: Optional[ReadinessResponse] = None
+        self._checked = 0.0
+        self._lock = asyncio.Lock()
+    
+    def _fresh(self) -> bool:
+        return self.result is not None and time.monotonic() - self._checked < settings.ready_check_interval
+    
+    async def get(self) -> ReadinessResponse:
+        if not self._fresh():
+            async with self._lock:
+                if not self._fresh():
+                    self.result = await self._check_all()
+                    self._checked = time.monotonic()
+        return self.result
+    
+    async def _check_all(self) -> ReadinessResponse:
+        checks = {"repository": _check_repository, **browser_backend.readiness_checks()}
+        results = await asyncio.gather(*(self._run(check) for check in checks.values()))
+        return ReadinessResponse(
+            status="ready" if all(result.ok for result in results) else "not_ready",
+            checked_at=datetime.now(),
+            checks=dict(zip(checks, results))
+        )
+    
+    @staticmethod
+    async def _run(check: Callable[[], Awaitable[None]]) -> ReadinessCheck:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), settings.ready_check_timeout)
+            error = None
+        except asyncio.TimeoutError:
+            error = f"No answer within {settings.ready_check_timeout}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        return ReadinessCheck(
+            ok=error is None,
+            latency_ms=round((time.perf_counter() - started) * 1000, 2),
+            error=error
+        )
+
+
+# Global readiness probe
+readiness = ReadinessProbe()
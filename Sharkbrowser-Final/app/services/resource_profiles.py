@@ -0,0 +1,131 @@
+# app/services/resource_profiles.py
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from app.config import settings
+
+# Matches the CMD in chromium-cdp.Dockerfile
+CHROMIUM_BASE_ARGS = [
+    "chromium",
+    "--headless",
+    "--no-sandbox",
+    "--disable-gpu",
+    "--remote-debugging-address=0.0.0.0",
+    "--remote-debugging-port=9222"
+]
+
+# Background work automation clients never benefit from
+PERFORMANCE_FLAGS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--no-first-run",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--disable-breakpad",
+    # Keep timers running in pages the client is not looking at
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding"
+]
+
+
+class ResourceProfile(BaseModel):
+    """Container limits and Chromium flags a browser is started with.
+
+    ``memory``, ``shm_size`` and ``tmpfs_size`` take Docker size strings such
+    as ``"512m"``; unset values leave Docker's defaults in place.
+    """
+    memory: Optional[str] = None
+    cpus: Optional[float] = None
+    shm_size: Optional[str] = None
+    tmpfs_size: Optional[str] = None  # user data dir and HOME live here when set
+    read_only: bool = False
+    renderer_process_limit: Optional[int] = None
+    performance_flags: bool = True
+    extra_flags: List[str] = []
+
+    def container_options(self, user_data_dir: Optional[str] = None) -> Dict:
+        """Keyword arguments for ``containers.run``."""
+        command = list(CHROMIUM_BASE_ARGS)
+        user_data_dir = user_data_dir or self.user_data_dir
+        if user_data_dir:
+            command.append(f"--user-data-dir={user_data_dir}")
+        options = {"command": command + self.chromium_flags()}
+        if self.memory:
+            # Same value for swap so a browser is limited, not pushed into swap
+            options["mem_limit"] = self.memory
+            options["memswap_limit"] = self.memory
+        if self.cpus:
+            options["nano_cpus"] = int(self.cpus * 1e9)
+        if self.shm_size:
+            options["shm_size"] = self.shm_size
+        if self.tmpfs_size:
+            options["tmpfs"] = {"/tmp": f"rw,nosuid,nodev,size={self.tmpfs_size}"}
+            options["environment"] = {"HOME": "/tmp"}
+        options["read_only"] = self.read_only
+        return options
+
+    @property
+    def user_data_dir(self) -> Optional[str]:
+        """Where Chromium keeps its profile in the container; None for its default."""
+        return "/tmp/chromium" if self.tmpfs_size else None
+
+    def chromium_flags(self) -> List[str]:
+        """Profile-specific flags, on top of the base headless/CDP arguments."""
+        flags = list(PERFORMANCE_FLAGS) if self.performance_flags else []
+        if self.renderer_process_limit:
+            flags.append(f"--renderer-process-limit={self.renderer_process_limit}")
+        return flags + self.extra_flags
+
+
+BUILTIN_PROFILES: Dict[str, ResourceProfile] = {
+    "small": ResourceProfile(
+        memory="512m",
+        cpus=0.5,
+        shm_size="256m",
+        tmpfs_size="128m",
+        read_only=True,
+        renderer_process_limit=2,
+        extra_flags=["--js-flags=--max-old-space-size=256"]
+    ),
+    "standard": ResourceProfile(
+        memory="1g",
+        cpus=1.0,
+        shm_size="512m",
+        tmpfs_size="256m",
+        read_only=True,
+        renderer_process_limit=4
+    ),
+    "large": ResourceProfile(
+        memory="2g",
+        cpus=2.0,
+        shm_size="1g",
+        tmpfs_size="512m",
+        read_only=True,
+        renderer_process_limit=8
+    ),
+    # The image's own CMD and Docker defaults, as before profiles existed
+    "unlimited": ResourceProfile(performance_flags=False)
+}
+
+
+def available_profiles() -> Dict[str, ResourceProfile]:
+    """Built-in profiles, overridden or extended by RESOURCE_PROFILES."""
+    profiles = dict(BUILTIN_PROFILES)
+    for name, overrides in settings.resource_profiles.items():
+        profiles[name] = ResourceProfile(**overrides)
+    return profiles
+
+
+def get_profile(name: Optional[str] = None) -> ResourceProfile:
+    """Look up a profile by name, defaulting to DEFAULT_PROFILE.
+
+    Raises ``ValueError`` for unknown names.
+    """
+    name = name or settings.default_profile
+    profiles = available_profiles()
+    if name not in profiles:
+        raise ValueError(f"Unknown resource profile '{name}'. Available: {', '.join(sorted(profiles))}")
+    return profiles[name]
@@ -0,0 +1,206 @@
+# app/services/screencast.py
+import asyncio
+import base64
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+import aiohttp
+from app.config import settings
+from app.services.shared_browser import ContextSession
+from app.utils.cdp_helper import CDPConnection
+
+# Seconds between adapting quality and frame rate to the slowest viewer
+ADAPT_INTERVAL = 2
+# A viewer that missed this share of frames in a window is falling behind
+LAGGING_DROP_RATIO = 0.25
+# Quality lost per step down; frame rate halves per step
+QUALITY_STEP = 15
+MIN_QUALITY = 20
+MAX_LEVEL = 4
+
+
+class PreviewViewer:
+    """One client of a preview, holding only the newest frame it has not sent yet.
+    
+    A viewer that cannot keep up skips frames instead of slowing the hub
+    or the other viewers down.
+    """
+    
+    def __init__(self):
+        self.frame: Optional[bytes] = None
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self._ready = asyncio.Event()
+    
+    def offer(self, frame: bytes):
+        if self.frame is not None:
+            self.dropped += 1
+        self.frame = frame
+        self._ready.set()
+    
+    def close(self):
+        self.closed = True
+        self._ready.set()
+    
+    async def next_frame(self) -> Optional[bytes]:
+        """Wait for a frame; None once the preview has ended."""
+        while self.frame is None and not self.closed:
+            self._ready.clear()
+            await self._ready.wait()
+        frame, self.frame = self.frame, None
+        if frame is not None:
+            self.sent += 1
+        return frame
+
+
+class ScreencastHub:
+    """Streams one CDP screencast per session and fans its frames out to every viewer.
+    
+    The hub paces screencast acks to the current frame rate, passes on only
+    frames that differ from the last one, and steps JPEG quality and frame
+    rate down while any viewer is dropping frames, and back up once none are.
+    """
+    
+    def __init__(self, session):
+        self.session = session
+        self.session_id = session.session_id
+        self.viewers: Set[PreviewViewer] = set()
+        self.frame: Optional[bytes] = None
+        self.level = 0
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def active(self) -> bool:
+        # A recycled browser goes on under another session ID, which must not be shown here
+        return self.session.session_id == self.session_id and self.session.status not in ("closed", "error")
+    
+    @property
+    def quality(self) -> int:
+        return max(settings.preview_quality - self.level * QUALITY_STEP, MIN_QUALITY)
+    
+    @property
+    def fps(self) -> float:
+        return max(settings.preview_max_fps / 2 ** self.level, 1)
+    
+    def add(self, viewer: PreviewViewer):
+        self.viewers.add(viewer)
+        if self.frame is not None:
+            # The screencast only sends frames on change; show the page as it is now
+            viewer.offer(self.frame)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def remove(self, viewer: PreviewViewer):
+        self.viewers.discard(viewer)
+        if not self.viewers:
+            await self.stop()
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for viewer in self.viewers:
+            viewer.close()
+    
+    async def _page_url(self) -> str:
+        """Page-level CDP WebSocket for the page being previewed."""
+        if isinstance(self.session, ContextSession):
+            return self.session.upstream_websocket_url
+        base = f"{self.session.cdp_host}:{self.session.cdp_port}"
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2)) as http:
+            async with http.get(f"http://{base}/json/list") as response:
+                targets = await response.json(content_type=None)
+        pages = [target for target in targets if target.get("type") == "page"]
+        if not pages:
+            raise RuntimeError("no page to preview")
+        return f"ws://{base}/devtools/page/{pages[0]['id']}"
+    
+    async def _run(self):
+        while self.active:
+            try:
+                async with CDPConnection(await self._page_url()) as cdp:
+                    await self._stream(cdp)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Preview of session {self.session_id} interrupted: {e}")
+            # The page was closed or the browser is restarting; follow the next one
+            await asyncio.sleep(1)
+        for viewer in self.viewers:
+            viewer.close()
+    
+    async def _stream(self, cdp: CDPConnection):
+        frames: asyncio.Queue = asyncio.Queue()
+        cdp.on("Page.screencastFrame", lambda params, _: frames.put_nowait(params))
+        await self._start(cdp)
+        last_ack = 0.0
+        next_adapt = time.monotonic() + ADAPT_INTERVAL
+        while not cdp.closed and self.active:
+            try:
+                frame = await asyncio.wait_for(frames.get(), ADAPT_INTERVAL)
+            except asyncio.TimeoutError:
+                frame = None
+            if frame is not None:
+                data = base64.b64decode(frame["data"])
+                if data != self.frame and self.active:
+                    self.frame = data
+                    for viewer in self.viewers:
+                        viewer.offer(data)
+                # Chromium sends the next frame only after this one is acked
+                await asyncio.sleep(max(last_ack + 1 / self.fps - time.monotonic(), 0))
+                await cdp.send("Page.screencastFrameAck", {"sessionId": frame["sessionId"]})
+                last_ack = time.monotonic()
+            if time.monotonic() >= next_adapt:
+                next_adapt = time.monotonic() + ADAPT_INTERVAL
+                quality = self.quality
+                self._adapt()
+                if self.quality != quality:
+                    await cdp.send("Page.stopScreencast")
+                    await self._start(cdp)
+    
+    async def _start(self, cdp: CDPConnection):
+        await cdp.send("Page.startScreencast", {
+            "format": "jpeg",
+            "quality": self.quality,
+            "maxWidth": settings.preview_max_width,
+            "maxHeight": settings.preview_max_height
+        })
+    
+    def _adapt(self):
+        lagging = any(
+            viewer.dropped >= LAGGING_DROP_RATIO * (viewer.sent + viewer.dropped) and viewer.dropped
+            for viewer in self.viewers
+        )
+        if lagging:
+            self.level = min(self.level + 1, MAX_LEVEL)
+        elif self.level and not any(viewer.dropped for viewer in self.viewers):
+            self.level -= 1
+        for viewer in self.viewers:
+            viewer.sent = viewer.dropped = 0
+
+
+class ScreencastRegistry:
+    """One hub per previewed session, kept only while someone is watching."""
+    
+    def __init__(self):
+        self.hubs: Dict[str, ScreencastHub] = {}
+    
+    @asynccontextmanager
+    async def watch(self, session) -> AsyncIterator[PreviewViewer]:
+        hub = self.hubs.get(session.session_id)
+        if hub is None or not hub.active or hub.session is not session:
+            hub = self.hubs[session.session_id] = ScreencastHub(session)
+        viewer = PreviewViewer()
+        hub.add(viewer)
+        try:
+            yield viewer
+        finally:
+            await hub.remove(viewer)
+            if not hub.viewers and self.hubs.get(session.session_id) is hub:
+                del self.hubs[session.session_id]
+
+
+# Global screencast registry
+screencasts = ScreencastRegistry()
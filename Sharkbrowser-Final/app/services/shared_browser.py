@@ -0,0 +1,173 @@
+# app/services/shared_browser.py
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from app.config import settings
+from app.models.session_model import SessionInfo
+from app.services.browser_session import BrowserSession
+from app.utils.cdp_helper import CDPConnection
+
+
+class ContextSession:
+    """A client session backed by an isolated browser context in a shared container.
+
+    Clients get a page-level CDP endpoint for a page inside their own context,
+    so cookies, storage and cache are not shared with other sessions.
+    """
+
+    websocket_kind = "page"
+
+    def __init__(self, shared: "SharedBrowser", session_id: str, browser_context_id: str, target_id: str):
+        self.shared = shared
+        self.session_id = session_id
+        self.browser_context_id = browser_context_id
+        self.target_id = target_id
+        self.created_at = datetime.now()
+        self.status = "active"
+        self.timings: Dict[str, float] = {}
+        # Activity tracking for the idle reaper
+        self.last_activity = time.monotonic()
+        self.activity_signature: Optional[tuple] = None
+        self.gateway_clients = 0
+    
+    def touch(self):
+        self.last_activity = time.monotonic()
+
+    @property
+    def port(self) -> int:
+        return self.shared.browser.port
+
+    @property
+    def cdp_host(self) -> str:
+        return self.shared.browser.cdp_host
+    
+    @property
+    def cdp_port(self) -> int:
+        return self.shared.browser.cdp_port
+    
+    @property
+    def container_id(self) -> Optional[str]:
+        return self.shared.browser.container_id
+
+    @property
+    def browser_id(self) -> Optional[str]:
+        return self.shared.browser.browser_id
+
+    @property
+    def cdp_websocket_url(self) -> str:
+        browser = self.shared.browser
+        if settings.gateway_mode:
+            return f"ws://{browser.public_host}:{settings.port}/devtools/page/{self.session_id}"
+        return f"ws://{browser.public_host}:{self.port}/devtools/page/{self.target_id}"
+
+    @property
+    def cdp_discovery_url(self) -> Optional[str]:
+        # /json on a shared browser would list every tenant's pages
+        return None
+
+    @property
+    def preview_url(self) -> Optional[str]:
+        public_host = self.shared.browser.public_host
+        if not settings.preview_enabled or not public_host:
+            return None
+        return f"http://{public_host}:{settings.port}/v1/sessions/{self.session_id}/preview"
+
+    @property
+    def upstream_websocket_url(self) -> str:
+        browser = self.shared.browser
+        return f"ws://{browser.cdp_host}:{browser.cdp_port}/devtools/page/{self.target_id}"
+
+    @property
+    def cdp_endpoint(self) -> str:
+        return self.cdp_websocket_url
+
+    @property
+    def uptime_seconds(self) -> int:
+        return int((datetime.now() - self.created_at).total_seconds())
+
+    def to_info(self) -> SessionInfo:
+        return SessionInfo(
+            session_id=self.session_id,
+            port=self.port,
+            cdp_endpoint=self.cdp_endpoint,
+            cdp_websocket_url=self.cdp_websocket_url,
+            cdp_discovery_url=self.cdp_discovery_url,
+            created_at=self.created_at,
+            uptime_seconds=self.uptime_seconds,
+            status=self.status,
+            video_preview_link=self.preview_url,
+            node_id=settings.cluster_node_id if settings.cluster_enabled else None
+        )
+
+    async def cleanup(self):
+        await self.shared.close_context(self.session_id)
+        self.status = "closed"
+
+
+class SharedBrowser:
+    """One Chromium container hosting several context sessions."""
+
+    def __init__(self, shared_id: str, port: int, profile: Optional[str] = None):
+        self.browser = BrowserSession(shared_id, port, profile)
+        self.contexts: Dict[str, ContextSession] = {}
+        self.reserved = 0
+        self.cdp: Optional[CDPConnection] = None
+        self.ready = asyncio.Event()
+        self.start_task: Optional[asyncio.Task] = None
+
+    @property
+    def profile(self) -> str:
+        return self.browser.profile
+
+    @property
+    def active(self) -> bool:
+        return self.browser.status == "active" and self.cdp is not None and not self.cdp.closed
+
+    @property
+    def free_slots(self) -> int:
+        return settings.contexts_per_container - len(self.contexts) - self.reserved
+
+    async def start(self) -> bool:
+        try:
+            if not await self.browser.start():
+                return False
+            self.cdp = await CDPConnection(self.browser.upstream_websocket_url).connect()
+            return True
+        except Exception as e:
+            print(f"Failed to connect to shared browser {self.browser.session_id}: {e}")
+            await self.browser.cleanup()
+            return False
+        finally:
+            self.ready.set()
+
+    async def open_context(self, session_id: str) -> ContextSession:
+        """Create an isolated browser context with one blank page for a session."""
+        phase_start = time.perf_counter()
+        context = await self.cdp.send("Target.createBrowserContext")
+        context_id = context["browserContextId"]
+        try:
+            target = await self.cdp.send(
+                "Target.createTarget",
+                {"url": "about:blank", "browserContextId": context_id}
+            )
+        except Exception:
+            await self.cdp.send("Target.disposeBrowserContext", {"browserContextId": context_id})
+            raise
+        session = ContextSession(self, session_id, context_id, target["targetId"])
+        session.timings["context_create"] = time.perf_counter() - phase_start
+        self.contexts[session_id] = session
+        return session
+
+    async def close_context(self, session_id: str):
+        session = self.contexts.pop(session_id, None)
+        if session and self.active:
+            try:
+                await self.cdp.send("Target.disposeBrowserContext", {"browserContextId": session.browser_context_id})
+            except Exception as e:
+                print(f"Error disposing context for session {session_id}: {e}")
+
+    async def close(self):
+        if self.cdp is not None:
+            await self.cdp.close()
+        await self.browser.cleanup()
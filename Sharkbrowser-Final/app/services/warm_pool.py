@@ -0,0 +1,93 @@
+# app/services/warm_pool.py
+import asyncio
+import uuid
+from collections import deque
+from typing import Callable, Deque, Optional
+from app.config import settings
+from app.services.browser_session import BrowserSession, allocate_port
+
+
+class WarmPool:
+    """Keeps pre-started browsers ready so sessions can be handed out instantly."""
+
+    def __init__(self, has_capacity: Callable[[], bool]):
+        self.idle: Deque[BrowserSession] = deque()
+        self.starting = 0
+        self._has_capacity = has_capacity
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def size(self) -> int:
+        """Browsers owned by the pool, including those still starting."""
+        return len(self.idle) + self.starting
+
+    @property
+    def max_idle(self) -> int:
+        return max(settings.warm_pool_min_idle, settings.warm_pool_max_idle)
+
+    def start(self):
+        if settings.warm_pool_min_idle <= 0 or self._task:
+            return
+        self._task = asyncio.create_task(self._refill_loop())
+        self._wakeup.set()
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self.idle:
+            await self.idle.popleft().cleanup()
+
+    def acquire(self) -> Optional[BrowserSession]:
+        """Take a ready browser from the pool, or None if the pool is empty."""
+        session = self.idle.popleft() if self.idle else None
+        self._wakeup.set()
+        return session
+
+    def notify(self):
+        """Wake the refill loop, e.g. after capacity was freed."""
+        self._wakeup.set()
+
+    async def _launch_one(self) -> bool:
+        try:
+            pool_id = f"pool-{uuid.uuid4()}"
+            port = allocate_port(pool_id)
+            if not port:
+                return False
+            session = BrowserSession(pool_id, port)
+            if not await session.start():
+                return False
+            self.idle.append(session)
+            return True
+        finally:
+            self.starting -= 1
+
+    async def _refill_loop(self):
+        backoff = 1
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.size >= settings.warm_pool_min_idle:
+                continue
+
+            launches = []
+            while self.size < self.max_idle and self._has_capacity():
+                self.starting += 1
+                launches.append(self._launch_one())
+            if not launches:
+                continue
+
+            results = await asyncio.gather(*launches, return_exceptions=True)
+            if all(result is True for result in results):
+                backoff = 1
+                continue
+
+            print(f"Warm pool refill incomplete, retrying in {backoff}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+            self._wakeup.set()
@@ -4,6 +4,6 @@ Utilities Package
 This package contains utility functions and helper classes.
 """
 
-from . import port_helper
+from . import port_helper, cdp_helper, host_resolver, host_pressure, metrics
 
-__all__ = ["port_helper"]
+__all__ = ["port_helper", "cdp_helper", "host_resolver", "host_pressure", "metrics"]
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import aiohttp
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+
+async def wait_for_cdp(
+    port: int,
+    host: str = "localhost",
+    timeout: float = 30,
+    initial_delay: float = 0.05,
+    max_delay: float = 1.0
+) -> Dict:
+    """Poll /json/version until the browser WebSocket is available.
+
+    Probes back off exponentially from ``initial_delay`` to ``max_delay`` and
+    give up with ``asyncio.TimeoutError`` once ``timeout`` seconds have passed.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = initial_delay
+    url = f"http://{host}:{port}/json/version"
+
+    async with aiohttp.ClientSession() as http:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError(f"CDP endpoint {url} not ready after {timeout}s")
+            try:
+                probe_timeout = aiohttp.ClientTimeout(total=min(remaining, 2))
+                async with http.get(url, timeout=probe_timeout) as response:
+                    if response.status == 200:
+                        version = await response.json(content_type=None)
+                        if version.get("webSocketDebuggerUrl"):
+                            return version
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                pass
+            await asyncio.sleep(max(0, min(delay, deadline - loop.time())))
+            delay = min(delay * 2, max_delay)
+
+
+def get_browser_id(websocket_url: str) -> str:
+    """Extract the browser ID from a /devtools/browser/<id> WebSocket URL."""
+    return urlparse(websocket_url).path.rsplit("/", 1)[-1]
+
+
+class CDPError(Exception):
+    """Raised when the browser answers a CDP command with an error."""
+
+
+class CDPConnection:
+    """Minimal CDP client over a browser or page WebSocket."""
+
+    def __init__(self, websocket_url: str, command_timeout: float = 10):
+        self.websocket_url = websocket_url
+        self.command_timeout = command_timeout
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._next_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._handlers: Dict[str, List[Callable[[Dict, Optional[str]], Any]]] = {}
+
+    @property
+    def closed(self) -> bool:
+        return self._ws is None or self._ws.closed
+
+    async def connect(self) -> "CDPConnection":
+        self._http = aiohttp.ClientSession()
+        try:
+            self._ws = await self._http.ws_connect(self.websocket_url, max_msg_size=0)
+        except Exception:
+            await self._http.close()
+            raise
+        self._reader = asyncio.create_task(self._read_loop())
+        return self
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+        if self._http is not None:
+            await self._http.close()
+
+    async def __aenter__(self) -> "CDPConnection":
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def on(self, method: str, handler: Callable[[Dict, Optional[str]], Any]):
+        """Register ``handler(params, session_id)`` for a CDP event."""
+        self._handlers.setdefault(method, []).append(handler)
+
+    async def send(self, method: str, params: Optional[Dict] = None, session_id: Optional[str] = None) -> Dict:
+        if self.closed:
+            raise ConnectionError(f"CDP connection to {self.websocket_url} is closed")
+        self._next_id += 1
+        message = {"id": self._next_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        try:
+            await self._ws.send_str(json.dumps(message))
+            return await asyncio.wait_for(future, self.command_timeout)
+        finally:
+            self._pending.pop(message["id"], None)
+
+    async def _read_loop(self):
+        try:
+            async for message in self._ws:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    break
+                data = json.loads(message.data)
+                if "id" in data:
+                    future = self._pending.get(data["id"])
+                    if future and not future.done():
+                        if "error" in data:
+                            future.set_exception(CDPError(data["error"].get("message", str(data["error"]))))
+                        else:
+                            future.set_result(data.get("result", {}))
+                    continue
+                for handler in self._handlers.get(data.get("method"), []):
+                    try:
+                        handler(data.get("params", {}), data.get("sessionId"))
+                    except Exception as e:
+                        print(f"CDP event handler for {data.get('method')} failed: {e}")
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("CDP connection closed"))
@@ -0,0 +1,102 @@
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_stat(path: str) -> Dict[str, int]:
+    stats = {}
+    for line in (_read(path) or "").splitlines():
+        key, _, value = line.partition(" ")
+        if value.strip().isdigit():
+            stats[key] = int(value)
+    return stats
+
+
+def _host_memory() -> Optional[float]:
+    """Fraction of host memory in use, from /proc/meminfo."""
+    meminfo = {}
+    for line in (_read("/proc/meminfo") or "").splitlines():
+        key, _, value = line.partition(":")
+        meminfo[key] = int(value.split()[0]) if value.split() else 0
+    if not meminfo.get("MemTotal") or "MemAvailable" not in meminfo:
+        return None
+    return 1 - meminfo["MemAvailable"] / meminfo["MemTotal"]
+
+
+def _cgroup_memory() -> Optional[float]:
+    """Fraction of this process's cgroup memory limit in use, if it has one.
+
+    Reclaimable page cache is excluded so the figure matches the working set
+    the kernel's OOM killer looks at.
+    """
+    limit = _read("/sys/fs/cgroup/memory.max")
+    if limit is not None:
+        usage = _read("/sys/fs/cgroup/memory.current")
+        inactive = _read_stat("/sys/fs/cgroup/memory.stat").get("inactive_file", 0)
+    else:
+        limit = _read("/sys/fs/cgroup/memory/memory.limit_in_bytes")
+        usage = _read("/sys/fs/cgroup/memory/memory.usage_in_bytes")
+        inactive = _read_stat("/sys/fs/cgroup/memory/memory.stat").get("total_inactive_file", 0)
+    if not limit or not usage or not limit.isdigit() or not usage.isdigit():
+        return None
+    # cgroup v1 reports "unlimited" as a huge page-aligned number
+    if int(limit) >= 1 << 62:
+        return None
+    return max(0, int(usage) - inactive) / int(limit)
+
+
+def _cpu_pressure() -> Optional[float]:
+    """Share of the last 10s in which runnable tasks waited for a CPU (PSI)."""
+    for path in ("/sys/fs/cgroup/cpu.pressure", "/proc/pressure/cpu"):
+        for line in (_read(path) or "").splitlines():
+            if line.startswith("some "):
+                fields = dict(field.split("=", 1) for field in line.split()[1:])
+                return float(fields["avg10"]) / 100
+    return None
+
+
+def _cpu_load() -> Optional[float]:
+    """One-minute load average per CPU, for kernels without PSI."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        return None
+
+
+class HostPressure:
+    """Samples memory and CPU pressure from cgroup and /proc files.
+
+    Browser containers are siblings of the API rather than children, so the
+    host-wide figures are what usually matter; the API's own cgroup limit is
+    taken into account too when it is tighter. Samples are cached for
+    ``ttl`` seconds so admission checks stay cheap.
+    """
+
+    def __init__(self, ttl: float = 1.0):
+        self.ttl = ttl
+        self._sample: Tuple[float, float] = (0.0, 0.0)
+        self._sampled_at = 0.0
+
+    def sample(self) -> Tuple[float, float]:
+        """Return ``(memory, cpu)`` pressure as fractions between 0 and 1."""
+        now = time.monotonic()
+        if now - self._sampled_at >= self.ttl:
+            memory = max((value for value in (_host_memory(), _cgroup_memory()) if value is not None), default=0.0)
+            cpu = _cpu_pressure()
+            if cpu is None:
+                cpu = _cpu_load() or 0.0
+            self._sample = (memory, cpu)
+            self._sampled_at = now
+        return self._sample
+
+
+# Global host pressure sampler
+host_pressure = HostPressure()
@@ -0,0 +1,65 @@
+import asyncio
+import time
+import aiohttp
+from typing import Optional
+from app.config import settings
+
+
+class HostResolver:
+    """Resolves the host advertised in CDP WebSocket URLs and caches it."""
+
+    METADATA_URL = "http://169.254.169.254/latest/meta-data/public-ipv4"
+    LOOKUP_URL = "https://api.ipify.org"
+
+    def __init__(self):
+        self._host: Optional[str] = None
+        self._resolved_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def host(self) -> str:
+        """Last known advertised host, without triggering a lookup."""
+        return settings.advertised_host or self._host or "localhost"
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._resolved_at >= settings.advertised_host_ttl
+
+    async def get(self) -> str:
+        """Return the advertised host, resolving it only when nothing is cached.
+
+        A stale cached value is served immediately while a refresh runs in the
+        background, so callers never wait on the network after startup.
+        """
+        if settings.advertised_host:
+            return settings.advertised_host
+        if self._host is None:
+            await self.refresh()
+        elif self._is_stale() and (self._refresh is None or self._refresh.done()):
+            self._refresh = asyncio.create_task(self.refresh())
+        return self.host
+
+    async def refresh(self):
+        async with self._lock:
+            if self._host is not None and not self._is_stale():
+                return
+            host = await self._lookup()
+            if host or self._host is None:
+                self._host = host or "localhost"
+            self._resolved_at = time.monotonic()
+            print(f"Advertised host resolved to {self._host}")
+
+    async def _lookup(self) -> Optional[str]:
+        async with aiohttp.ClientSession() as http:
+            for url, timeout in ((self.METADATA_URL, 2), (self.LOOKUP_URL, 5)):
+                try:
+                    async with http.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                        if response.status == 200:
+                            return (await response.text()).strip()
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    pass
+        return None
+
+
+# Global host resolver instance
+host_resolver = HostResolver()
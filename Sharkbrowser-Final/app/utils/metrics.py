@@ -0,0 +1,108 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DOCKER_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Session lifecycle
+SESSION_CREATE_SECONDS = Histogram(
+    "sharkbrowser_session_create_seconds",
+    "End-to-end session creation time, excluding time queued for admission",
+    ["mode", "source"],
+    buckets=LATENCY_BUCKETS
+)
+SESSION_CREATE_PHASE_SECONDS = Histogram(
+    "sharkbrowser_session_create_phase_seconds",
+    "Time spent in each phase of session creation",
+    ["phase"],
+    buckets=LATENCY_BUCKETS
+)
+SESSION_RELEASE_SECONDS = Histogram(
+    "sharkbrowser_session_release_seconds",
+    "Time to release a session, including its repository delete",
+    buckets=LATENCY_BUCKETS
+)
+SESSION_CLEANUP_SECONDS = Histogram(
+    "sharkbrowser_session_cleanup_seconds",
+    "Time to tear down a session's container or browser context",
+    ["kind"],
+    buckets=LATENCY_BUCKETS
+)
+SESSIONS_CREATED = Counter(
+    "sharkbrowser_sessions_created_total",
+    "Sessions created",
+    ["mode", "source"]
+)
+SESSION_CREATE_FAILURES = Counter(
+    "sharkbrowser_session_create_failures_total",
+    "Session creations that failed",
+    ["reason"]
+)
+SESSIONS_CLOSED = Counter(
+    "sharkbrowser_sessions_closed_total",
+    "Sessions torn down",
+    ["reason"]
+)
+SESSIONS_ACTIVE = Gauge(
+    "sharkbrowser_sessions_active",
+    "Sessions currently held by clients",
+    ["mode"]
+)
+BROWSER_EXITS = Counter(
+    "sharkbrowser_browser_exits_total",
+    "Browsers that died without the API stopping them",
+    ["reason"]
+)
+SESSIONS_REPLACED = Counter(
+    "sharkbrowser_sessions_replaced_total",
+    "Sessions given a new browser after theirs died"
+)
+BROWSERS_RECYCLED = Counter(
+    "sharkbrowser_browsers_recycled_total",
+    "Released browsers reset for reuse, by whether the reset succeeded",
+    ["result"]
+)
+BROWSERS = Gauge(
+    "sharkbrowser_browsers",
+    "Browser containers by role",
+    ["role"]
+)
+
+# Admission
+ADMISSION_QUEUED = Counter(
+    "sharkbrowser_admission_queued_total",
+    "Create requests that had to wait for capacity"
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "sharkbrowser_admission_wait_seconds",
+    "Time create requests spent queued for admission",
+    buckets=LATENCY_BUCKETS
+)
+ADMISSION_QUEUE_LENGTH = Gauge(
+    "sharkbrowser_admission_queue_length",
+    "Create requests currently waiting for capacity"
+)
+HOST_PRESSURE = Gauge(
+    "sharkbrowser_host_pressure_ratio",
+    "Host memory use and CPU pressure as seen by admission control",
+    ["resource"]
+)
+
+# Docker
+DOCKER_CALL_SECONDS = Histogram(
+    "sharkbrowser_docker_call_seconds",
+    "Docker API call latency, including time queued for a worker thread",
+    ["operation"],
+    buckets=DOCKER_BUCKETS
+)
+DOCKER_CALL_ERRORS = Counter(
+    "sharkbrowser_docker_call_errors_total",
+    "Docker API calls that raised",
+    ["operation"]
+)
+
+# Ports
+PORTS = Gauge(
+    "sharkbrowser_ports",
+    "Browser port range by state",
+    ["state"]
+)
@@ -1,58 +1,117 @@
 import socket
-import random
-from typing import List, Optional
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
 from app.config import settings
 
 
 class PortAllocator:
-    """Utility class for managing port allocation for browser sessions."""
-    
+    """Utility class for managing port allocation for browser sessions.
+
+    Free ports live in a FIFO free list, so acquiring and releasing a port is
+    O(1) regardless of the size of the range. A port is only bind-tested when
+    it is handed out; ports found busy on the host are parked and re-verified
+    lazily once the free list runs dry.
+    """
+
     def __init__(self):
-        self.used_ports: set = set()
         self.port_range = range(settings.port_start, settings.port_end + 1)
-    
-    def is_port_available(self, port: int) -> bool:
-        """Check if a port is available for use."""
-        if port in self.used_ports:
-            return False
-        
-        # Test if port is actually available on the system
+        self.free: Deque[int] = deque(self.port_range)
+        self.free_set: Set[int] = set(self.port_range)
+        self.blocked: Set[int] = set()
+        self.leases: Dict[int, Optional[str]] = {}
+
+    @property
+    def used_ports(self) -> Set[int]:
+        return set(self.leases)
+
+    @staticmethod
+    def can_bind(port: int) -> bool:
+        """Test if a port is actually available on the system."""
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
             try:
                 s.bind(('', port))
                 return True
             except OSError:
                 return False
-    
-    def get_available_port(self) -> Optional[int]:
-        """Get an available port from the configured range."""
-        # Create a shuffled list of ports to randomize allocation
-        available_ports = [p for p in self.port_range if self.is_port_available(p)]
-        
-        if not available_ports:
-            return None
-        
-        # Return a random available port
-        port = random.choice(available_ports)
-        self.used_ports.add(port)
-        return port
-    
-    def release_port(self, port: int) -> bool:
-        """Release a port back to the pool."""
-        if port in self.used_ports:
-            self.used_ports.remove(port)
-            return True
-        return False
-    
-    def get_available_count(self) -> int:
-        """Get the count of available ports."""
-        return len([p for p in self.port_range if self.is_port_available(p)])
-    
+
+    def is_port_available(self, port: int) -> bool:
+        """Check if a port is available for use."""
+        if port not in self.port_range or port in self.leases:
+            return False
+        return self.can_bind(port)
+
+    def _lease(self, port: int, session_id: Optional[str]):
+        self.free_set.discard(port)
+        self.blocked.discard(port)
+        self.leases[port] = session_id
+
+    def get_available_port(self, session_id: Optional[str] = None) -> Optional[int]:
+        """Lease the next free port from the configured range."""
+        if not self.free_set:
+            self.recheck_blocked()
+
+        while self.free:
+            port = self.free.popleft()
+            if port not in self.free_set:
+                continue  # stale entry left behind by reserve_port()
+            if self.can_bind(port):
+                self._lease(port, session_id)
+                return port
+            self.free_set.discard(port)
+            self.blocked.add(port)
+        return None
+
+    def reserve_port(self, port: int, session_id: Optional[str] = None) -> bool:
+        """Lease a specific port, e.g. one already held by a running container."""
+        if port not in self.port_range or port in self.leases:
+            return False
+        self._lease(port, session_id)
+        return True
+
+    def transfer(self, port: int, session_id: str) -> bool:
+        """Move an existing lease to another session."""
+        if port not in self.leases:
+            return False
+        self.leases[port] = session_id
+        return True
+
+    def release_port(self, port: int, session_id: Optional[str]) -> bool:
+        """Release a port back to the pool if ``session_id`` still holds its lease.
+
+        A session torn down twice must not free a port that has since been
+        leased to another session.
+        """
+        if port not in self.leases or self.leases[port] != session_id:
+            return False
+        del self.leases[port]
+        if port not in self.free_set:
+            self.free_set.add(port)
+            self.free.append(port)
+        return True
+
+    def recheck_blocked(self) -> int:
+        """Return parked ports that can be bound again to the free list."""
+        recovered = [p for p in self.blocked if self.can_bind(p)]
+        for port in recovered:
+            self.blocked.discard(port)
+            self.free_set.add(port)
+            self.free.append(port)
+        return len(recovered)
+
+    def get_available_count(self, recheck: bool = False) -> int:
+        """Get the count of available ports.
+
+        With ``recheck``, parked ports are re-verified first once the free
+        list is empty, so a port that was busy for a moment is not lost.
+        """
+        if recheck and not self.free_set and self.blocked:
+            self.recheck_blocked()
+        return len(self.free_set)
+
     def get_used_ports(self) -> List[int]:
         """Get list of currently used ports."""
-        return list(self.used_ports)
+        return list(self.leases)
 
 
 # Global port allocator instance
 port_allocator = PortAllocator()
-
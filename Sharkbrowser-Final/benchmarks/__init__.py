@@ -0,0 +1,5 @@
+"""
+Benchmarks Package
+
+Load tests that run the API against a fake Docker and CDP backend.
+"""
@@ -0,0 +1,292 @@
+# benchmarks/fake_docker.py
+"""Stand-in for the Docker SDK that serves fake CDP endpoints instead of Chromium.
+
+Only the calls the API makes are implemented. Each "container" gets a small
+aiohttp server on its published port, or on port 9222 of its own loopback
+address when it joins a network, that answers /json/version, /json/list
+and the CDP target and screencast commands the API sends, after a
+configurable start-up delay.
+"""
+import asyncio
+import base64
+import queue
+import random
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+from aiohttp import web
+import docker
+
+
+class FakeCDPServer:
+    """Runs every fake browser's CDP server on one background event loop."""
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="fake-cdp", daemon=True)
+        self.thread.start()
+        self.runners: Dict[str, web.AppRunner] = {}
+    
+    def _app(self, container: "FakeContainer") -> web.Application:
+        async def version(request):
+            return web.json_response({
+                "Browser": "HeadlessChrome/fake",
+                "webSocketDebuggerUrl": f"ws://{request.host}/devtools/browser/{container.browser_id}"
+            })
+        
+        async def targets(request):
+            return web.json_response([
+                {
+                    "id": target,
+                    "type": "page",
+                    "url": "about:blank",
+                    "webSocketDebuggerUrl": f"ws://{request.host}/devtools/page/{target}"
+                }
+                for target in container.targets
+            ])
+        
+        async def devtools(request):
+            ws = web.WebSocketResponse(max_msg_size=0)
+            await ws.prepare(request)
+            frames = 0
+            
+            async def send_frame():
+                if ws.closed:
+                    return
+                # The page "changes" on every other frame
+                data = base64.b64encode(f"fake-jpeg-{frames // 2}".encode()).decode()
+                await ws.send_json({"method": "Page.screencastFrame", "params": {"data": data, "sessionId": frames}})
+            
+            async for message in ws:
+                command = message.json()
+                method = command.get("method")
+                params = command.get("params", {})
+                result = {}
+                if method == "Target.createBrowserContext":
+                    result = {"browserContextId": uuid.uuid4().hex}
+                elif method == "Target.createTarget":
+                    target = uuid.uuid4().hex
+                    container.targets.append(target)
+                    result = {"targetId": target}
+                elif method == "Target.closeTarget":
+                    if params.get("targetId") in container.targets:
+                        container.targets.remove(params["targetId"])
+                    result = {"success": True}
+                elif method == "Page.startScreencast":
+                    asyncio.get_running_loop().call_later(0.01, lambda: asyncio.ensure_future(send_frame()))
+                elif method == "Page.screencastFrameAck":
+                    frames += 1
+                    asyncio.get_running_loop().call_later(1 / 30, lambda: asyncio.ensure_future(send_frame()))
+                elif method == "Target.getTargets":
+                    result = {"targetInfos": [
+                        {"targetId": target, "type": "page", "url": "about:blank", "attached": False}
+                        for target in container.targets
+                    ]}
+                await ws.send_json({"id": command["id"], "result": result})
+            return ws
+        
+        app = web.Application()
+        app.router.add_get("/json/version", version)
+        app.router.add_get("/json/list", targets)
+        app.router.add_get("/json", targets)
+        app.router.add_get("/devtools/{kind}/{target_id}", devtools)
+        return app
+    
+    def start(self, container: "FakeContainer", host: str, port: int, delay: float):
+        async def serve():
+            await asyncio.sleep(delay)
+            if container.status != "running":
+                return
+            # A dying browser drops its CDP clients instead of waiting for them to disconnect
+            runner = web.AppRunner(self._app(container), shutdown_timeout=0.1)
+            await runner.setup()
+            await web.TCPSite(runner, host, port).start()
+            self.runners[container.id] = runner
+        
+        asyncio.run_coroutine_threadsafe(serve(), self.loop)
+    
+    def stop(self, container: "FakeContainer"):
+        runner = self.runners.pop(container.id, None)
+        if runner:
+            asyncio.run_coroutine_threadsafe(runner.cleanup(), self.loop).result()
+
+
+class FakeContainer:
+    def __init__(self, client: "FakeDockerClient", name: str, labels: Dict[str, str], port: Optional[int]):
+        self.client = client
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.labels = labels
+        self.port = port
+        self.status = "running"
+        self.browser_id = str(uuid.uuid4())
+        self.targets: List[str] = [uuid.uuid4().hex]
+        self.attrs = {
+            "Id": self.id,
+            "Names": [f"/{name}"],
+            "Labels": labels,
+            "Config": {"Labels": labels},
+            "NetworkSettings": {"Networks": {}},
+            "State": {"Status": "running"}
+        }
+    
+    def reload(self):
+        pass
+    
+    def rename(self, name: str):
+        self.name = name
+        self.attrs["Names"] = [f"/{name}"]
+    
+    def stop(self, timeout: int = 10):
+        self.kill()
+    
+    def kill(self, signal: Optional[str] = None, exit_code: int = 137):
+        if self.status != "running":
+            raise docker.errors.NotFound(f"Container {self.id} is not running")
+        self.status = "exited"
+        self.attrs["State"]["Status"] = "exited"
+        self.client.server.stop(self)
+        self.client.emit(self, "die", exitCode=str(exit_code))
+        # Containers are started with remove=True, so they vanish once stopped
+        self.client.containers.forget(self)
+    
+    def remove(self, force: bool = False):
+        if self.status == "running":
+            self.kill()
+        else:
+            raise docker.errors.NotFound(f"Container {self.id} not found")
+
+
+class FakeContainers:
+    def __init__(self, client: "FakeDockerClient"):
+        self.client = client
+        self._containers: Dict[str, FakeContainer] = {}
+        self._addresses = 0
+        self._lock = threading.Lock()
+    
+    def run(self, image: str, name: Optional[str] = None, ports: Optional[Dict] = None,
+            labels: Optional[Dict[str, str]] = None, **kwargs) -> FakeContainer:
+        port = (ports or {}).get("9222/tcp")
+        container = FakeContainer(self.client, name or uuid.uuid4().hex, labels or {}, port)
+        network = kwargs.get("network")
+        with self._lock:
+            self._containers[container.id] = container
+            if network:
+                # Every container on a network listens on 9222 of its own address
+                self._addresses += 1
+                address = f"127.0.{self._addresses // 250}.{self._addresses % 250 + 2}"
+                container.attrs["NetworkSettings"]["Networks"][network] = {"IPAddress": address}
+        delay = random.uniform(*self.client.start_delay)
+        if port:
+            self.client.server.start(container, "127.0.0.1", port, delay)
+        elif network:
+            self.client.server.start(container, address, 9222, delay)
+        return container
+    
+    def forget(self, container: FakeContainer):
+        with self._lock:
+            self._containers.pop(container.id, None)
+    
+    def get(self, container_id: str) -> FakeContainer:
+        with self._lock:
+            for container in self._containers.values():
+                if container_id in (container.id, container.name):
+                    return container
+        raise docker.errors.NotFound(f"Container {container_id} not found")
+    
+    def list(self, all: bool = False, filters: Optional[Dict] = None, sparse: bool = False) -> List[FakeContainer]:
+        filters = filters or {}
+        with self._lock:
+            containers = list(self._containers.values())
+        if "name" in filters:
+            containers = [container for container in containers if filters["name"] in container.name]
+        return [container for container in containers if matches_labels(container, filters.get("label", []))]
+
+
+def matches_labels(container: FakeContainer, labels) -> bool:
+    for label in [labels] if isinstance(labels, str) else labels:
+        key, _, value = label.partition("=")
+        if key not in container.labels or (value and container.labels[key] != value):
+            return False
+    return True
+
+
+class FakeEventStream:
+    """Blocking iterator over container events, like ``docker.types.CancellableStream``."""
+    
+    def __init__(self, filters: Dict):
+        self.filters = filters
+        self.events: queue.Queue = queue.Queue()
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> Dict:
+        event = self.events.get()
+        if event is None:
+            raise StopIteration
+        return event
+    
+    def close(self):
+        self.events.put(None)
+
+
+class FakeAPI:
+    """The low-level ``docker.APIClient`` calls the API makes."""
+    
+    def __init__(self, client: "FakeDockerClient"):
+        self.client = client
+    
+    def remove_container(self, container: str, force: bool = False, v: bool = False):
+        self.client.containers.get(container).remove(force=force)
+    
+    def stop(self, container: str, timeout: Optional[int] = None):
+        if timeout is not None and not isinstance(timeout, int):
+            # dockerd parses the t query parameter as an integer
+            raise docker.errors.APIError(f"400 Client Error: invalid value for t: {timeout!r}")
+        self.client.containers.get(container).stop(timeout=timeout)
+    
+    def kill(self, container: str, signal: Optional[str] = None):
+        self.client.containers.get(container).kill(signal=signal)
+
+
+class FakeImages:
+    def get(self, name: str):
+        return object()
+
+
+class FakeDockerClient:
+    """Drop-in for ``docker.DockerClient`` with simulated container start delays."""
+    
+    def __init__(self, start_delay: Tuple[float, float] = (0.05, 0.2)):
+        self.start_delay = start_delay
+        self.server = FakeCDPServer()
+        self.containers = FakeContainers(self)
+        self.images = FakeImages()
+        self.api = FakeAPI(self)
+        self.streams: List[FakeEventStream] = []
+    
+    def events(self, decode: bool = False, filters: Optional[Dict] = None) -> FakeEventStream:
+        stream = FakeEventStream(filters or {})
+        self.streams.append(stream)
+        return stream
+    
+    def emit(self, container: FakeContainer, action: str, **attributes):
+        event = {
+            "Type": "container",
+            "Action": action,
+            "id": container.id,
+            "Actor": {"ID": container.id, "Attributes": {"name": container.name, **container.labels, **attributes}},
+            "time": int(time.time())
+        }
+        for stream in self.streams:
+            actions = stream.filters.get("event")
+            if (not actions or action in actions) and matches_labels(container, stream.filters.get("label", [])):
+                stream.events.put(event)
+    
+    def ping(self) -> bool:
+        return True
+    
+    def close(self):
+        pass
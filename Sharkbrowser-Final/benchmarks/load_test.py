@@ -0,0 +1,167 @@
+# benchmarks/load_test.py
+"""Load-test the API in-process against the fake Docker backend.
+
+Each worker repeatedly creates a session, reads it, lists sessions and
+releases it, and the harness reports per-request latency percentiles and
+throughput. Run from the project root:
+
+    python -m benchmarks.load_test --sessions 500 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+OPERATIONS = ["create", "get", "list", "release"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200, help="sessions to create and release in total")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent client workers")
+    parser.add_argument("--max-browsers", type=int, default=50, help="MAX_BROWSERS for the run")
+    parser.add_argument("--warm-pool", type=int, default=2, help="WARM_POOL_MIN_IDLE (0 disables the pool)")
+    parser.add_argument("--mode", choices=["container", "context"], default="container")
+    parser.add_argument("--gateway", action="store_true",
+                        help="serve sessions through the CDP gateway (implied by --mode context)")
+    parser.add_argument("--start-delay", type=float, nargs=2, default=(0.05, 0.2), metavar=("MIN", "MAX"),
+                        help="simulated container start-up delay range in seconds")
+    parser.add_argument("--hold", type=float, default=0, help="seconds to hold each session before releasing it")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args()
+
+
+def configure(args: argparse.Namespace, workdir: str):
+    """Point settings at a throwaway SQLite database and a private port range.
+
+    Must run before anything under ``app`` is imported; variables already set
+    in the environment win.
+    """
+    pool_max = max(args.warm_pool * 2, args.warm_pool)
+    defaults = {
+        "DATABASE_TYPE": "sqlite",
+        "DATABASE_URL": f"sqlite:///{workdir}/benchmark.db",
+        "ADVERTISED_HOST": "127.0.0.1",
+        "MAX_BROWSERS": str(args.max_browsers),
+        "PORT_START": "19100",
+        "PORT_END": str(19100 + args.max_browsers + pool_max),
+        "WARM_POOL_MIN_IDLE": str(args.warm_pool),
+        "WARM_POOL_MAX_IDLE": str(pool_max),
+        "SESSION_MODE": args.mode,
+        # Measure the API, not whatever else is running on the host
+        "ADMISSION_MAX_MEMORY_PERCENT": "0",
+        "ADMISSION_MAX_CPU_PERCENT": "0"
+    }
+    if args.gateway or args.mode == "context":
+        # Context sessions are only served through the gateway
+        defaults["CDP_GATEWAY_ENABLED"] = "true"
+        defaults["DOCKER_NETWORK"] = "sharkbrowser-benchmark"
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+
+
+def percentile(samples: List[float], pct: int) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    import httpx
+    from app.main import app
+    from app.services.docker_client import docker_client
+    from benchmarks.fake_docker import FakeDockerClient
+
+    # Installed before startup so every Docker call goes to the fake
+    docker_client._client = FakeDockerClient(start_delay=tuple(args.start_delay))
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    remaining = iter(range(args.sessions))
+
+    async def timed(operation: str, request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await request
+        latencies[operation].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            errors[operation] += 1
+        return response
+
+    async def worker(client: httpx.AsyncClient):
+        for _ in remaining:
+            response = await timed("create", client.post("/v1/sessions/", json={}))
+            if response.status_code != 200:
+                continue
+            session_id = response.json()["session_id"]
+            await timed("get", client.get(f"/v1/sessions/{session_id}"))
+            await timed("list", client.get("/v1/sessions/", params={"limit": 100}))
+            if args.hold:
+                await asyncio.sleep(args.hold)
+            await timed("release", client.post("/v1/sessions/release", json={"session_id": session_id}))
+
+    async with app.router.lifespan_context(app):
+        # Let the warm pool fill so the first requests aren't all cold starts
+        await asyncio.sleep(max(args.start_delay) * 2 if args.warm_pool else 0)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=120) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+
+    report = {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "mode": args.mode,
+        "elapsed_seconds": round(elapsed, 3),
+        "sessions_per_second": round((len(latencies["release"]) - errors["release"]) / elapsed, 2),
+        "requests_per_second": round(sum(len(samples) for samples in latencies.values()) / elapsed, 2),
+        "operations": {}
+    }
+    for operation in OPERATIONS:
+        samples = latencies[operation]
+        if not samples:
+            continue
+        report["operations"][operation] = {
+            "count": len(samples),
+            "errors": errors[operation],
+            **{
+                f"p{pct}_ms": round(percentile(samples, pct) * 1000, 2)
+                for pct in (50, 95, 99)
+            },
+            "max_ms": round(max(samples) * 1000, 2)
+        }
+    return report
+
+
+def print_report(report: Dict):
+    print(f"\n{report['sessions']} sessions, {report['concurrency']} workers, "
+          f"{report['mode']} mode in {report['elapsed_seconds']}s")
+    print(f"{report['sessions_per_second']} sessions/s, {report['requests_per_second']} requests/s\n")
+    print(f"{'operation':<10}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for operation, stats in report["operations"].items():
+        print(f"{operation:<10}{stats['count']:>8}{stats['errors']:>8}{stats['p50_ms']:>10}"
+              f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}")
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="sharkbrowser-bench-") as workdir:
+        configure(args, workdir)
+        # Keep stdout clean for the JSON report; the API logs with print()
+        with redirect_stdout(sys.stderr if args.json else sys.stdout):
+            report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
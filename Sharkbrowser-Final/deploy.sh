@@ -46,12 +46,26 @@ else
     exit 1
 fi
 
+# Shared network so the API can reach browser containers directly
+docker network inspect sharkbrowser &> /dev/null || docker network create sharkbrowser
+
+# With CDP_GATEWAY=true all sessions are proxied through port 8000. Otherwise
+# each browser container publishes its own host port from the browser range,
+# so the API container must not claim that range itself.
+if [ "${CDP_GATEWAY:-false}" = "true" ]; then
+    PORT_ARGS="-e CDP_GATEWAY_ENABLED=true"
+else
+    PORT_ARGS=""
+fi
+
 # Run the API
 echo "🚀 Starting SharkBrowser API..."
 docker run -d \
     --name sharkbrowser \
+    --network sharkbrowser \
+    -e DOCKER_NETWORK=sharkbrowser \
     -p 8000:8000 \
-    -p 9000-9020:9000-9020 \
+    $PORT_ARGS \
     -v /var/run/docker.sock:/var/run/docker.sock \
     --restart unless-stopped \
     sharkbrowser-api
@@ -65,10 +79,11 @@ if [ $? -eq 0 ]; then
     echo ""
     echo "📋 Available endpoints:"
     echo "   POST /v1/sessions - Create browser session"
-    echo "   POST /v1/sessions/multiple - Create 5 browsers"
+    echo "   POST /v1/sessions/multiple - Create several browsers"
     echo "   GET /v1/sessions - List sessions"
     echo "   POST /v1/sessions/release - Release session"
     echo "   GET /health - Health check"
+    echo "   GET /ready - Readiness check"
     echo ""
     echo "🔧 To check logs: docker logs sharkbrowser"
     echo "🛑 To stop: docker stop sharkbrowser"